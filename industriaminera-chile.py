@@ -55,18 +55,10 @@ import pandas as pd
 # Álgebra
 import numpy as np
 
-# Gráficos
-import matplotlib.pyplot as plt
-from matplotlib.pyplot import figure
-import matplotlib
-import matplotlib.ticker as mtick
-import seaborn as sns
-### Para mejor visualización
-sns.set(rc={'figure.figsize':(10,8.27)})
-
-# Otros
-from IPython.display import Markdown
-import json
+# Gráficos (matplotlib y seaborn se cargan al dibujar el primer gráfico, ver mineria/graficos.py)
+
+# Otros (tablas y títulos en el notebook o, fuera de él, en la consola)
+from mineria.presentacion import mostrar
 
 # Traducción (no es estable, se descarta uso)
 # import googletrans
@@ -81,41 +73,24 @@ import json
 
 # Manipulando datos para trabajarlos
 
+### Las fuentes se parsean una sola vez y se guardan en caché columnar (ver mineria/fuentes.py).
+### Cada etapa del procesamiento es una función con dependencias declaradas y memoizada en disco
+### según sus fuentes (ver mineria/etapas.py): sólo se recalcula la rama cuyas fuentes cambiaron.
+### Con MINERIA_COMPACTO=1, obtener devuelve las tablas en su forma compacta (ver mineria/compacto.py).
+from mineria import obtener, companias, concentracion, cuotas, regiones
+
 ## 9. Analizar importancia del sector productivo para el mercado nacional e internacional
 
 ### Producción de cobre por compañía (INE)
-csv_compañia = pd.read_csv('./cobre/compania.csv', index_col=0)
-
-### Producción de minerales metálicos a nivel nacional (INE)
-csv_minerales = pd.read_csv('./mineral_general/mineral_produccion.csv', index_col=0)
-
-### Producción de minerales no metálicos a nivel nacional (INE)
-csv_minerales_no = pd.read_csv('./mineral_general/mineral_produccion_no.csv', index_col=0)
-
-### Producción de cobre por región (datos.gob.cl)
-csv_region = pd.read_csv('./cobre/region.csv', index_col=0)
-
-### Producción de Cu, Ag, Au, Mo y Fe
+### Producción de minerales metálicos y no metálicos a nivel nacional (INE)
+### Producción de Cu, Ag, Au, Mo y Fe por país (World Mining Data)
 v = ['cu', 'ag', 'au', 'mo', 'fe']
-for minerale in v:
-    exec("""csv_{} = pd.read_csv("./paises/compartepais_{}.csv", sep=';', skiprows=1, index_col=0)""".format(minerale, minerale))
-
-### Producción de minerales y metales por país ()
 
 ## 10. Variación del precio de los últimos cinco años y causa de este cambio
 
-### Saldo balanza comercial
-csv_balanza = pd.read_csv("./paises/Balanza_comercial.csv", sep=';', skiprows=4, index_col=0, usecols=range(10),
-                         encoding='latin-1', )
-
-### Exportaciones (Databank)
-csv_export = pd.read_csv('./paises/exportacionpais.csv', skiprows=4)
-
-### Aporte al PIB (Databank)
-csv_pib = pd.read_csv('./paises/pibpais.csv', skiprows=4)
-
+### Saldo balanza comercial (Banco Central)
+### Exportaciones y aporte al PIB (Databank)
 ### Precio del cobre (Macrotrends)
-csv_pcobre = pd.read_csv('./cobre/precios.csv', skiprows=15)
 
 
 # ## Manipulando datos
@@ -125,118 +100,54 @@ csv_pcobre = pd.read_csv('./cobre/precios.csv', skiprows=15)
 
 # Manipulando datos (para inciso 9)
 
-## Producción de cobre por compañía
-compañia = csv_compañia
-
-### Limpiando carácteres indeseados
-compañia['2018'] = csv_compañia['2018'].replace(
-    '\.', '', regex=True).replace(',', '.', regex=True)
-compañia = compañia.transpose()
-compañia.iloc[1:].index = pd.DatetimeIndex(compañia.index[1:]).year
-### Limpiando comas indeseadas
-compañia = compañia.replace(',','.', regex=True).replace('-',0, regex=True).astype(float)
-compañia_cumsum = compañia.cumsum()
-
-### Producción por mineral metálico
-minerales = csv_minerales.groupby(['Year', 'Metallic and non-metallic minerals'], as_index=False
-                                 ).sum().drop(['Flag Codes', 'Flags'], axis=1)
-### Traduciendo
-minerales.columns = ['Año', 'Categoría', 'Valor total']
-trad = {'Copper':'Cobre', 'Gold':'Oro', 'Iron':'Hierro', 'Lead':'Plomo', 'Manganese':'Manganeso', 'Molybdenum':'Molibdeno',
-        'Silver':'Plata', 'Zinc':'Zinc' }
-minerales['Categoría'] = minerales['Categoría'].apply(lambda x: trad[x])
-minerales.index = minerales['Año']
-minerales.drop('Año', axis=1, inplace=True)
-
-### Producción por mineral no metálico
-minerales_no = csv_minerales_no.groupby(['Year', 'Metallic and non-metallic minerals'], as_index=False
-                                 ).sum().drop(['Flag Codes', 'Flags'], axis=1)
-### Traduciendo
-minerales_no.columns = ['Año', 'Categoría', 'Valor total']
-trad__no = minerales_no['Categoría'].unique() + ['" : "Barita', '" : "Compuestos de boro', '" : "Carbonato de calcio', '" : "Arcillas',
-        '" : "Diatomita', '" : "Dolomita', '" : "Feldespato', '" : "Yodo', '" : "Compuestos de litio',
-        '" : "Nitratos', '" : "Rocas ornamentales', '" : "Rocas fosfóricas', '" : "Yeso',
-        '" : "Compuestos de potasio', '" : "Pumicita', '" : "Pirofilita',
-        '" : "Recursos de silicio', '" : "Cloruro de sodio', '" : "Sulfato de sodio', '" : "Talco',
-        '" : "Zeolitas', '" : "Sulfato de cobre', '" : "Compuestos de azufre', '" : "Turba',
-        '" : "Perlita']
-i = 0
-trad_no = ''
-for val in trad__no.tolist():
-    if i == 0:
-        trad_no += '{'
-    if i < 1:
-        trad_no += '"' + '"'.join([val])
-    else:
-        trad_no += '", "' + '"'.join([val])
-    i += 1
-trad_no += '"}'
-trad_no_metalicos = json.loads(trad_no)
-minerales_no['Categoría'] = minerales_no['Categoría'].apply(lambda x: trad_no_metalicos[x])
-minerales_no.index = minerales_no['Año']
-minerales_no.drop('Año', axis=1, inplace=True)
+## Producción de cobre por compañía, por año y acumulada
+compañia = obtener('compania')
+compañia_cumsum = obtener('compania_acumulada')
+### Compañías por grupo (divisiones de CODELCO y operadores privados)
+empresas = obtener('empresas')
+
+### Producción por mineral metálico y no metálico, traducida
+minerales = obtener('minerales')
+minerales_no = obtener('minerales_no')
+
+## Producción de cobre por región: totales, participación y variación anual
+region = obtener('region')
 
 ## Proporción de distintos minerales por país en torno a producción mundial
+cuota_paises = obtener('cuota_paises')
+cuota_totales = obtener('cuota_totales')
 
-### Corrigiendo comas
-for minerale in v:
-    exec("""{} = csv_{}.replace(',', '.', regex=True).drop(['Rank 2018', 'unit', 'Production 2019', 'Share cum.%', 'Share HHI'], axis=1, )
-    """.format(minerale, minerale))
+## Concentración de mercado (HHI, CR y rankings) por mineral y año, 2015-2019
+mercados = obtener('concentracion_mercados')
 
 # Manipulando datos (para inciso 10)
 
-### Balanza comercial
-### Filas útiles
-balanza = csv_balanza[1:223]
-### Nombre de columnas
-balanza.columns = ['Mes', 'Exportaciones Mensuales', 'Exportaciones Acumuladas Anuales', 'Importaciones Mensuales',
-                  'Importaciones Acumuladas Anuales', 'Saldo Mensual Balanza Comercial', 
-                   'Saldo Acumulado Anual Balanza Comercial', 'Saldo Mensual Balanza Pagos', 
-                   'Saldo Acumulado Anual Balanza Pagos']
-### Diccionario para meses
-meses = {'Enero': 1, 'Enero ': 1, 'Febrero': 2, 'Febrero ': 2, 'Marzo': 3, 'Marzo ': 3,
-         'Abril': 4, 'Abril ': 4, 'Mayo': 5, 'Mayo ': 5,
-         'Junio': 6, 'Junio ': 6, 'Julio': 7, 'Julio ': 7, 'Agosto': 8, 'Agosto ': 8,
-         'Septiembre': 9, 'Septiembre ': 9, 'Octubre': 10, 'Octubre ': 10,
-         'Noviembre': 11, 'Noviembre ': 11, 'Diciembre': 12, 'Diciembre ': 12}
-balanza.Mes = balanza.Mes.apply(lambda x: meses[x])
-### Para rellenar años
-añito = balanza.index.to_frame().fillna(method='ffill')
-balanza.index = añito['Año']
-### Juntando fechitas
-balanza.index = pd.to_datetime(balanza.index + '-' + balanza.Mes.astype(str))
-### Columna de estado de balanza comercial
-balanza['Resultado'] = ['Superávit comercial o neutro' if x > 0 else 'Déficit comercial' for x in balanza['Saldo Mensual Balanza Comercial']]
-
-## Exportaciones
-export = csv_export[csv_export['Country Name'] == 'Chile'][csv_export.columns[4:-1]].transpose()[37]
-
-## Aporte al PIB
-pib = csv_pib[csv_pib['Country Name'] == 'Chile'][csv_pib.columns[4:-1]].transpose()[37]
-
-## Precio del cobre
-pcobre = csv_pcobre
-pcobre.index = pd.to_datetime(pcobre['date'])
-pcobre.index = pd.DatetimeIndex(pcobre.index).year
-pcobre = pcobre.groupby(pcobre.index).mean()[1:-1]
-pcobre.index = pib.index
-
-## Datos
-data = pd.DataFrame([export, pib, pcobre[' value']]).transpose()
-data.columns = ['Exportaciones (%)', 'Aporte PIB (%)', 'Precio del cobre (dólares)']
-data.index = pd.to_datetime(csv_export.columns[4:-1]).transpose()
-display(Markdown('## Exportaciones y otros del cobre'), data, 
-        Markdown('## Producción de cobre en miles de TM por compañía por año'), compañia,
-        Markdown('## Producción de cobre en miles de TM por compañía acumulada por año'), compañia_cumsum,
-        Markdown('## Producción de minerales metálicos en Chile, por año y categoría'), minerales,
-        Markdown('## Producción de minerales no metálicos en Chile, por año y categoría'), minerales_no)
+### Balanza comercial (con fechas para graficar)
+balanza = obtener('balanza')
+balanza = balanza.set_axis(balanza.index.to_timestamp())
+
+## Exportaciones, aporte al PIB y precio del cobre
+export = obtener('export')
+pib = obtener('pib')
+pcobre = obtener('pcobre')
+
+## Datos (alineados por año)
+data = obtener('data')
+mostrar('## Exportaciones y otros del cobre', data,
+        '## Producción de cobre en miles de TM por compañía por año', compañia,
+        '## Producción de cobre en miles de TM por compañía acumulada por año', compañia_cumsum,
+        '## Producción de minerales metálicos en Chile, por año y categoría', minerales,
+        '## Producción de minerales no metálicos en Chile, por año y categoría', minerales_no)
 
 ## Otros datos
-elementos = [ag, au, fe, mo, cu]
 for minerale in v:
-    display(Markdown('## Ranking de producción de {} por país en proporción a producción mundial'.format(minerale)))
-    exec('display({}[:10])'.format(minerale))
-display(Markdown('## Balanza comercial Chile'), balanza)
+    mostrar('## Ranking de producción de {} por país en proporción a producción mundial'.format(minerale),
+            cuotas.de(cuota_paises, minerale, 10))
+mostrar('## Producción de cobre por región en {}'.format(region['regiones'].index[-1]),
+        regiones.resumen(region, region['regiones'].index[-1]))
+mostrar('## Concentración del mercado mundial del cobre', mercados['mercados'].loc['Copper'],
+        '## Minerales con mercado muy concentrado en 2019 (HHI > 2500)', concentracion.riesgo(mercados, 2019))
+mostrar('## Balanza comercial Chile', balanza)
 
 
 # ## Función para graficar
@@ -244,43 +155,17 @@ display(Markdown('## Balanza comercial Chile'), balanza)
 # In[107]:
 
 
-### Definiendo función para graficar
-def dispersion(x, y, data, tamaño=(9, 6), res=100, 
-               color=None , titulo=None, xlabel=None, ylabel=None, sym=None
-               ):
-    fig, ax = plt.subplots(figsize=tamaño, dpi=res)
-    ax.yaxis.set_major_formatter(mtick.PercentFormatter(symbol=sym))
-    plt.scatter(x=x, y=y, color=color, data=data)
-    plt.title(titulo)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.show()
-    
-def bar(data, tamaño=(9, 6), res=100, x=None, y=None,
-               color=None , titulo=None, xlabel=None, ylabel=None, rot=0, ci=None, offset=True
-               ):
-    fig, ax = plt.subplots(figsize=tamaño, dpi=res)
-    sns.barplot(data=data, x=x, y=y, hue=color, ci=ci)
-    plt.title(titulo)
-    plt.xticks(rotation=rot)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    ax.get_yaxis().set_major_formatter(
-    matplotlib.ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
-    plt.show()
-    
-def lin(data, tamaño=(9, 6), res=100, 
-               color=None , titulo=None, xlabel=None, ylabel=None, rot=0
-               ):
-    fig, ax = plt.subplots(figsize=tamaño, dpi=res)
-    sns.lineplot(data=data)
-    ax.get_yaxis().set_major_formatter(
-    matplotlib.ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
-    plt.xticks(rotation=rot)
-    plt.title(titulo)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.show()
+### Funciones para graficar (ver mineria/graficos.py); cada gráfico se declara como
+### especificación, de modo que el informe completo también se puede renderizar sin interfaz
+### (con MINERIA_FIGURAS definido sólo se declaran y se guardan al final)
+import os
+from mineria import graficos
+informe = []
+
+def graficar(**especificacion):
+    informe.append(especificacion)
+    if not os.environ.get('MINERIA_FIGURAS'):
+        graficos.dibujar(especificacion)
 
 
 # ## Mercado nacional
@@ -292,7 +177,7 @@ def lin(data, tamaño=(9, 6), res=100,
 
 
 # Gráfico simple de aporte al PIB de las exportaciones de recursos naturales
-dispersion(x=data.index, y='Aporte PIB (%)', data=data, color='tab:orange',
+graficar(nombre='aporte_pib', tipo='dispersion', x=data.index, y='Aporte PIB (%)', data=data, color='tab:orange',
           xlabel='Año', ylabel='Aporte al PIB en porcentaje', 
           titulo='Aporte al PIB de los recursos naturales en Chile (%)', sym='%')
 
@@ -305,7 +190,7 @@ dispersion(x=data.index, y='Aporte PIB (%)', data=data, color='tab:orange',
 # In[109]:
 
 
-bar(data=minerales[-35:], x='Categoría', y='Valor total', color=minerales[-35:].index,
+graficar(nombre='metalicos', tipo='bar', data=minerales[-35:], x='Categoría', y='Valor total', color=minerales[-35:].index,
    titulo='Producción chilena de minerales metálicos (2015 a 2019)',
    xlabel='Mineral', ylabel='Producción (millones de toneladas métricas finas)',
    tamaño=(10, 6))
@@ -320,7 +205,7 @@ bar(data=minerales[-35:], x='Categoría', y='Valor total', color=minerales[-35:]
 # In[110]:
 
 
-bar(data=minerales[(minerales.loc[:, 'Categoría'] != 'Cobre') &
+graficar(nombre='metalicos_menores', tipo='bar', data=minerales[(minerales.loc[:, 'Categoría'] != 'Cobre') &
           (minerales.loc[:, 'Categoría'] != 'Hierro') ][-25:], x='Categoría', y='Valor total', 
     color=minerales[(minerales.loc[:, 'Categoría'] != 'Cobre') &
           (minerales.loc[:, 'Categoría'] != 'Hierro') ][-25:].index,
@@ -343,7 +228,7 @@ bar(data=minerales[(minerales.loc[:, 'Categoría'] != 'Cobre') &
 # In[111]:
 
 
-bar(data=minerales_no[356:], x='Categoría', y='Valor total', color=minerales_no[356:].index,
+graficar(nombre='no_metalicos', tipo='bar', data=minerales_no[356:], x='Categoría', y='Valor total', color=minerales_no[356:].index,
    titulo='Producción chilena de minerales no metálicos (2015 a 2019)',
    xlabel='Mineral', ylabel='Producción (millones de toneladas métricas finas)',
    tamaño=(10, 6),
@@ -361,7 +246,7 @@ bar(data=minerales_no[356:], x='Categoría', y='Valor total', color=minerales_no
 
 
 ### Gráficamos aquellas compañías mineras con producción acumulada sobre las 8000 miles de toneladas de cobre fino
-lin(data=compañia_cumsum.loc[:, (compañia_cumsum[compañia_cumsum.columns]  > 8000).any()].iloc[:, :-1],
+graficar(nombre='companias_acumulada', tipo='lin', data=empresas['acumulada'][companias.sobre(empresas, 8000)],
    rot=45,
    titulo='Serie de tiempo de producción de cobre por minera en Chile (1998 a 2018)',
    xlabel='Año',
@@ -372,7 +257,7 @@ lin(data=compañia_cumsum.loc[:, (compañia_cumsum[compañia_cumsum.columns]  >
 
 
 ### Gráfico comparativo de producción de cobre por minera en Chile
-bar(data=compañia.iloc[:, :-1].sum().to_frame().transpose(), ci=None,
+graficar(nombre='companias', tipo='bar', data=empresas['totales'].to_frame().transpose(), ci=None,
    titulo='Producción de cobre por minera en Chile (1998 a 2018)',
    xlabel='Minera', ylabel='Producción de cobre fino en miles de toneladas (total)',
    tamaño=(10, 6), rot=90)
@@ -382,8 +267,7 @@ bar(data=compañia.iloc[:, :-1].sum().to_frame().transpose(), ci=None,
 
 
 ### Gráfico comparativo de Divisiones de Codelco (entidad pública)
-bar(data=compañia.iloc[:, :-1].iloc[:, compañia.iloc[:, :-1].columns.str.
-                contains('División')].sum().to_frame().transpose(), ci=None,
+graficar(nombre='codelco', tipo='bar', data=companias.produccion(empresas, grupo=companias.CODELCO).to_frame().transpose(), ci=None,
    titulo='Producción de cobre por divisiones de CODELCO en Chile (1998 a 2018)',
    xlabel='División', ylabel='Producción de cobre fino en miles de toneladas (total)',
    tamaño=(10, 6), rot=45)
@@ -392,62 +276,48 @@ bar(data=compañia.iloc[:, :-1].iloc[:, compañia.iloc[:, :-1].columns.str.
 # In[115]:
 
 
-display(Markdown('> En total, CODELCO suma **{}** miles de toneladas de cobre fino.'.format(compañia.iloc[:, :-1]
-                 .iloc[:, compañia.iloc[:, :-1].sum().to_frame().
-                 transpose().columns.str.contains('División')].sum().sum())))
+mostrar('> En total, CODELCO suma **{}** miles de toneladas de cobre fino.'.format(
+    companias.por_grupo(empresas)[companias.CODELCO]))
 
 
 # In[116]:
 
 
-elementos = [ag, au, fe, mo, cu]
+elementos = [cuotas.de(cuota_paises, m) for m in ['ag', 'au', 'fe', 'mo', 'cu']]
 nomb = ['Plata', 'Oro', 'Hierro', 'Molibdeno', 'Cobre']
-i = 0
-for el in elementos:
-    if nomb[i] == 'Hierro':
-        fig, ax = plt.subplots()
-        ax.pie(el[:16]['Share in %'], labels=el[:16].Country, autopct='%1.1f%%',
-                 startangle=5, explode=[0.05]*16, labeldistance=1.05, radius=1, pctdistance=1.4)
-        plt.title('Gráfico de torta de producción mundial de {}'.format(nomb[i]), pad=60, loc='left')
-        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
-        plt.show()
+for el, nombre in zip(elementos, nomb):
+    titulo = 'Gráfico de torta de producción mundial de {}'.format(nombre)
+    if nombre == 'Hierro':
+        graficar(nombre='torta_' + nombre.lower(), tipo='torta', valores=el[:16]['cuota'], etiquetas=el[:16].pais,
+                 titulo=titulo, separacion=0.05, inicio=5, distancia=1.05, radio=1, pct_distancia=1.4, pad=60)
     else:
-        fig, ax = plt.subplots()
-        ax.pie(el[:10]['Share in %'], labels=el[:10].Country, autopct='%1.1f%%',
-                 startangle=10, explode=[0.15]*10, labeldistance=1.2, radius=2)
-        plt.title('Gráfico de torta de producción mundial de {}'.format(nomb[i]), pad=40, loc='left')
-        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
-        plt.show()
-    i += 1
+        graficar(nombre='torta_' + nombre.lower(), tipo='torta', valores=el[:10]['cuota'], etiquetas=el[:10].pais,
+                 titulo=titulo)
 
 
 # In[365]:
 
 
-ax = sns.displot(data=balanza, 
-                x=balanza.index,
-                hue='Resultado', kde=True)
-plt.title('Distribución de resultados de balanza comercial en Chile a lo largo de los años')
-ax.set(xlabel='Año', ylabel='Conteo de resultados mensuales por año')
-plt.show()
+graficar(nombre='balanza_distribucion', tipo='distribucion', data=balanza,
+         x=balanza.index, hue='Resultado',
+         titulo='Distribución de resultados de balanza comercial en Chile a lo largo de los años',
+         xlabel='Año', ylabel='Conteo de resultados mensuales por año')
 
 
 # In[364]:
 
 
-ax = sns.scatterplot(data=balanza, 
-                x=balanza.index, y='Saldo Mensual Balanza Comercial',
-                hue='Resultado')
-plt.title('Saldo de balanza comercial en millones de dólares (fob) en Chile')
-ax.set(xlabel='Año', ylabel='Conteo de resultados mensuales por año')
-plt.show()
+graficar(nombre='balanza_saldo', tipo='puntos', data=balanza,
+         x=balanza.index, y='Saldo Mensual Balanza Comercial', hue='Resultado',
+         titulo='Saldo de balanza comercial en millones de dólares (fob) en Chile',
+         xlabel='Año', ylabel='Conteo de resultados mensuales por año')
 
 
 # In[118]:
 
 
 # Gráfico simple de exportaciones chilenas
-dispersion(x=data.index, y='Exportaciones (%)', data=data, color='tab:blue',
+graficar(nombre='exportaciones', tipo='dispersion', x=data.index, y='Exportaciones (%)', data=data, color='tab:blue',
           xlabel='Año', ylabel='Exportaciones de minerales y metales', 
           titulo='Porcentaje de exportaciones chilenas de minerales y metales (% de exportaciones totales)',
           sym='%')
@@ -457,7 +327,7 @@ dispersion(x=data.index, y='Exportaciones (%)', data=data, color='tab:blue',
 
 
 # Gráfico simple del precio del cobre en dólares
-dispersion(x=data.index, y='Precio del cobre (dólares)', data=data, color='tab:green',
+graficar(nombre='precio_cobre', tipo='dispersion', x=data.index, y='Precio del cobre (dólares)', data=data, color='tab:green',
           xlabel='Año', ylabel='Precio en dólares', 
           titulo='Precio del cobre en dólares histórico', sym='US')
 
@@ -467,3 +337,57 @@ dispersion(x=data.index, y='Precio del cobre (dólares)', data=data, color='tab:
 
 data.corr()
 
+
+# ## Producción de Chile frente a la mundial
+# 
+# Serie 1950–2018 de Cochilco: participación de Chile en la producción mundial, crecimiento anual compuesto y correlaciones móviles de la producción chilena con el precio del cobre, el aporte al PIB y las exportaciones.
+
+# In[ ]:
+
+
+from mineria import estadisticas
+
+mostrar('## Crecimiento de la producción de cobre 1990-2018', estadisticas.resumen(1990, 2018),
+        '## Estadísticas móviles de 10 años', estadisticas.ventana(10).dropna(how='all'))
+graficar(nombre='cuota_chile', tipo='lin', data=estadisticas.panel()[['cuota']].dropna(),
+         xlabel='Año', ylabel='Participación (%)', titulo='Participación de Chile en la producción mundial de cobre')
+graficar(nombre='correlacion_movil', tipo='lin',
+         data=estadisticas.ventanas([10, 20]).xs('corr_precio', axis=1, level='estadistica').dropna(how='all'),
+         xlabel='Año', ylabel='Correlación', titulo='Correlación móvil entre producción chilena y precio del cobre')
+
+
+# ## Informe sin interfaz
+# 
+# Con la variable de entorno `MINERIA_FIGURAS` se guardan todos los gráficos anteriores en ese directorio (backend Agg, en paralelo), redibujando sólo los que cambiaron.
+
+# In[ ]:
+
+
+if os.environ.get('MINERIA_FIGURAS'):
+    graficos.renderizar(informe, os.environ['MINERIA_FIGURAS'], formatos=('png', 'svg'))
+
+
+# ## Tiempos y memoria por paso
+# 
+# Con la variable de entorno `MINERIA_INSTRUMENTACION` cada carga, etapa y gráfico emite un evento con su tiempo, memoria y filas (`memoria` los guarda en el proceso, una ruta los agrega a ese archivo como líneas JSON).
+
+# In[ ]:
+
+
+from mineria import instrumentacion
+
+if instrumentacion.eventos:
+    mostrar('## Tiempos y memoria por paso', instrumentacion.resumen())
+
+
+# ## Memoria de las tablas
+# 
+# Con la variable de entorno `MINERIA_COMPACTO=1` se muestra cuánto ocupan las tablas procesadas en su forma compacta: claves como categóricas sobre un diccionario compartido, números en el tipo más chico que conserva sus valores y ejes de años compartidos.
+
+# In[ ]:
+
+
+from mineria import compacto
+
+if compacto.ACTIVO:
+    mostrar('## Bytes ahorrados por tabla', compacto.tablas()[1])
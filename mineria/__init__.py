@@ -0,0 +1,29 @@
+"""Herramientas de carga y procesamiento de datos de la industria minera en Chile.
+
+Importar el paquete no lee ningún archivo ni carga librerías de gráficos:
+los submódulos se importan al usarlos y cada tabla se calcula recién al
+pedirla con ``obtener`` (ver ``mineria.etapas``).
+"""
+
+import importlib
+
+SUBMODULOS = ['balanza', 'banco_mundial', 'benchmark', 'cache', 'compacto', 'companias', 'concentracion',
+              'cuotas', 'estadisticas', 'etapas', 'fuentes', 'graficos', 'instrumentacion', 'libros', 'numeros',
+              'precios', 'presentacion', 'regiones', 'traducciones']
+
+
+def obtener(nombre, refrescar=False):
+    """Tabla ``nombre`` del procesamiento (ver ``mineria.etapas.ETAPAS``).
+
+    Con ``MINERIA_COMPACTO=1`` se devuelve su versión compacta (ver ``mineria.compacto``).
+    """
+    from . import compacto, etapas
+    if compacto.ACTIVO:
+        return compacto.obtener(nombre, refrescar)
+    return etapas.obtener(nombre, refrescar)
+
+
+def __getattr__(nombre):
+    if nombre in SUBMODULOS:
+        return importlib.import_module('.' + nombre, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, nombre))
@@ -0,0 +1,79 @@
+"""Balanza comercial mensual de Chile (Banco Central).
+
+El libro ``paises/Balanza_comercial.xls`` trae encabezados, notas al pie y
+filas vacías alrededor de los datos, y el año sólo aparece en enero. El
+bloque de datos se detecta por las filas cuyo mes es un nombre de mes
+válido, por lo que nuevas publicaciones (con más meses) se leen sin ajustar
+rangos de filas a mano.
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import libros
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto',
+         'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+COLUMNAS = ['Exportaciones Mensuales', 'Exportaciones Acumuladas Anuales', 'Importaciones Mensuales',
+            'Importaciones Acumuladas Anuales', 'Saldo Mensual Balanza Comercial',
+            'Saldo Acumulado Anual Balanza Comercial', 'Saldo Mensual Balanza Pagos',
+            'Saldo Acumulado Anual Balanza Pagos']
+
+# Grupos de columnas del encabezado de la hoja del libro, cada uno con 'Mes' y 'Acumulado Anual',
+# en el orden de COLUMNAS
+GRUPOS = ['Exportaciones', 'Importaciones', 'Saldo de la Balanza Comercial', 'Saldo de la Balanza de Pagos']
+
+SUPERAVIT = 'Superávit comercial o neutro'
+DEFICIT = 'Déficit comercial'
+
+
+@libros.libro('balanza', 'paises/Balanza_comercial.xls', version=2)
+def hoja(bruto):
+    """Tabla de la hoja del libro con el año como índice, el mes y las ``COLUMNAS``.
+
+    El encabezado se busca en la hoja: la fila que empieza con ``Año`` y,
+    sobre ella, los grupos de ``GRUPOS``.
+    """
+    fila = libros._fila(bruto, 'Año')
+    grupos = bruto.iloc[fila - 1].ffill().astype('string').str.strip()
+    subcolumnas = bruto.iloc[fila].astype('string').str.strip()
+    nombres = dict(zip([(g, c) for g in GRUPOS for c in ('Mes', 'Acumulado Anual')], COLUMNAS))
+    posiciones = {nombres[llave]: j for j, llave in enumerate(zip(grupos, subcolumnas)) if llave in nombres}
+    faltantes = [c for c in COLUMNAS if c not in posiciones]
+    if faltantes:
+        raise ValueError('La hoja de la balanza no tiene las columnas {}'.format(faltantes))
+    df = bruto.iloc[fila + 1:, [0, 1] + [posiciones[c] for c in COLUMNAS]]
+    df = df.set_axis(['Año', 'Mes'] + COLUMNAS, axis=1)
+    df = df[df['Mes'].notna()]
+    df = libros._numeros(df, ['Año'] + COLUMNAS)
+    df['Mes'] = df['Mes'].astype('string')
+    return df.set_index('Año')
+
+
+def parsear(bruto):
+    """Extrae el bloque mensual de la tabla ``bruto`` leída por ``libros``.
+
+    Devuelve una tabla con ``PeriodIndex`` mensual, el número de mes, las
+    cifras en millones de dólares fob y la columna ``Resultado``.
+    """
+    ### Mes como categoría (sin espacios); lo que no es mes queda con código -1
+    mes = pd.Categorical(bruto.iloc[:, 0].str.strip(), categories=MESES).codes
+    bloque = mes >= 0
+    ### El año sólo figura en enero: se propaga hacia abajo
+    año = pd.to_numeric(pd.Series(bruto.index), errors='coerce').ffill().to_numpy()
+    fechas = pd.to_datetime(pd.DataFrame({'year': año[bloque], 'month': mes[bloque] + 1, 'day': 1}))
+    balanza = pd.DataFrame(bruto.iloc[bloque, 1:].to_numpy(), columns=COLUMNAS,
+                           index=pd.PeriodIndex(fechas.dt.to_period('M'), name='Periodo'))
+    balanza.insert(0, 'Mes', mes[bloque] + 1)
+    ### Estado de la balanza comercial
+    balanza['Resultado'] = pd.Categorical.from_codes(
+        np.where(balanza['Saldo Mensual Balanza Comercial'].to_numpy() > 0, 0, 1),
+        categories=[SUPERAVIT, DEFICIT])
+    return balanza
+
+
+def leer(refrescar=False):
+    """Balanza comercial mensual, desde la caché del libro Excel."""
+    libros.convertir('balanza', refrescar)
+    return parsear(libros.hoja('balanza', 'Balanza_comercial'))
@@ -0,0 +1,61 @@
+"""Indicadores del Banco Mundial (Databank) en formato largo.
+
+Los archivos ``paises/exportacionpais.csv`` y ``paises/pibpais.csv`` vienen
+en formato ancho (un país por fila, un año por columna). Aquí se funden una
+sola vez en una tabla larga indexada por (país, indicador, año), ordenada,
+de modo que extraer cualquier conjunto de países no recorre la tabla
+completa ni transpone el formato ancho.
+"""
+
+import pandas as pd
+
+from . import cache, fuentes
+
+# Alias de las fuentes y su código de indicador
+INDICADORES = {
+    'export': 'TX.VAL.MMTL.ZS.UN',  # Exportaciones de metales y menas (% de exportaciones)
+    'pib': 'NY.GDP.TOTL.RT.ZS',  # Renta por recursos naturales (% del PIB)
+}
+
+
+def _largo(ruta):
+    ancho = fuentes._banco_mundial(ruta)
+    largo = ancho.drop(columns=['Country Name', 'Indicator Name']).melt(
+        id_vars=['Country Code', 'Indicator Code'], var_name='año', value_name='valor').dropna(subset=['valor'])
+    largo.columns = ['pais', 'indicador', 'año', 'valor']
+    largo['año'] = largo['año'].astype(int)
+    return largo.set_index(['pais', 'indicador', 'año']).sort_index()
+
+
+def tabla(indicadores=None, refrescar=False):
+    """Tabla larga (país, indicador, año) -> valor de los ``indicadores`` indicados (todos por defecto)."""
+    indicadores = list(INDICADORES) if indicadores is None else indicadores
+    partes = []
+    for nombre in indicadores:
+        ruta, _, version = fuentes.FUENTES[nombre]
+        partes.append(cache.cacheado('largo_' + nombre, ruta, _largo, version=version, refrescar=refrescar))
+    return pd.concat(partes).sort_index()
+
+
+def nombres(refrescar=False):
+    """Nombre de cada país por código ISO3."""
+    return fuentes.cargar('export', refrescar).set_index('Country Code')['Country Name']
+
+
+def _codigo(indicador):
+    return INDICADORES.get(indicador, indicador)
+
+
+def serie(indicadores, pais, indicador):
+    """Serie anual de ``indicador`` (alias o código) para ``pais`` (código ISO3)."""
+    return indicadores.loc[(pais, _codigo(indicador)), 'valor'].rename(pais)
+
+
+def panel(indicadores, paises, indicador):
+    """Tabla año x país de ``indicador`` para la lista ``paises``.
+
+    Se une con otras series anuales mediante ``precios.alinear``.
+    """
+    seleccion = indicadores.loc[(list(paises), _codigo(indicador)), 'valor']
+    return seleccion.droplevel('indicador').unstack('pais').reindex(columns=list(paises))
+
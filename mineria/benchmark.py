@@ -0,0 +1,299 @@
+"""Mediciones de tiempo y memoria de cada etapa del procesamiento.
+
+Cada caso de ``CASOS`` prepara sus datos de entrada a partir de los archivos
+del repositorio, multiplicados por una escala (más días de precios, más
+compañías, más países, más años), y luego mide sólo el procesamiento: el
+mejor tiempo y la mediana de varias repeticiones y el pico de memoria
+(``tracemalloc``) de una ejecución adicional. Los resultados se escriben en
+JSON y pueden compararse con un JSON anterior tomado como base::
+
+    python -m mineria.benchmark --escalas 1 10 100 --salida resultados.json
+    python -m mineria.benchmark --base resultados.json --tolerancia 0.25
+
+La comparación termina con código 1 si algún caso quedó más lento que la
+base por sobre la tolerancia; también termina con código 1 (tras escribir el
+JSON) si algún caso falló. La escala 1 usa los datos tal como vienen.
+"""
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from . import balanza as bc
+from . import cache, companias, concentracion, etapas, fuentes, graficos, libros, precios, regiones, traducciones
+
+# Los casos con gráficos omiten escalas mayores a esta (seaborn no escala a millones de puntos)
+ESCALA_GRAFICOS = 100
+
+
+def _filas(valor):
+    ### Filas de una tabla, de las tablas de un diccionario o líneas de un texto
+    if isinstance(valor, (str, bytes)):
+        return valor.count('\n' if isinstance(valor, str) else b'\n')
+    if isinstance(valor, dict):
+        return sum(_filas(v) for v in valor.values())
+    return len(valor) if hasattr(valor, '__len__') else 0
+
+
+# Preparación de datos sintéticos: cada función recibe la escala y devuelve los argumentos del caso
+
+def _texto_precios(escala):
+    ### CSV de Macrotrends con `escala` observaciones por día, repartidas en el día (las
+    ### fechas quedan en el mismo rango, dentro de los límites de datetime64[ns])
+    contenido = (cache.RAIZ / precios.RUTA).read_bytes()
+    encabezado = contenido[:contenido.index(b'\n', contenido.index(b'date, value')) + 1]
+    diario = precios.diario()
+    fechas = np.repeat(diario.index.to_numpy(), escala) + np.tile(
+        np.arange(escala) * (np.timedelta64(86400, 's') // escala), len(diario))
+    formato = '%Y-%m-%d' if escala == 1 else '%Y-%m-%d %H:%M:%S'
+    cuerpo = pd.DataFrame({'date': pd.DatetimeIndex(fechas).strftime(formato),
+                           'value': np.repeat(diario.to_numpy(), escala)}).to_csv(
+        index=False, header=False, float_format='%.4f')
+    return encabezado + cuerpo.encode()
+
+
+def _preparar_carga_precios(escala):
+    return (_texto_precios(escala),)
+
+
+def _preparar_pcobre(escala):
+    return (fuentes._precios(io.BytesIO(_texto_precios(escala))).dropna(subset=['value']),)
+
+
+def _texto_compania(escala):
+    ### CSV de compañías con `escala` veces las compañías (la fila de totales queda al final)
+    lineas = (cache.RAIZ / fuentes.FUENTES['compania'][0]).read_text(encoding='utf-8-sig').splitlines()
+    encabezado, empresas, total = lineas[0], lineas[1:-1], lineas[-1]
+    copias = [linea if i == 0 else linea.replace(',', ' #{},'.format(i), 1)
+              for i in range(escala) for linea in empresas]
+    return '\n'.join([encabezado] + copias + [total]) + '\n'
+
+
+def _preparar_compania(escala):
+    return (_texto_compania(escala),)
+
+
+def _preparar_empresas(escala):
+    return (fuentes._compania(io.StringIO(_texto_compania(escala))).transpose(),)
+
+
+def _repetir_años(df, columna, escala):
+    ### `escala` copias de `df` con los años de `columna` desplazados para no repetirse
+    años = df[columna].max() - df[columna].min() + 1
+    return pd.concat([df.assign(**{columna: df[columna] - i * años}) for i in range(escala)],
+                     ignore_index=True)
+
+
+def _preparar_minerales_no(escala):
+    return (_repetir_años(fuentes.cargar('minerales_no'), 'Year', escala), traducciones.NO_METALICOS)
+
+
+def _preparar_regiones(escala):
+    return (_repetir_años(fuentes.cargar('region'), 'Year', escala),)
+
+
+def _preparar_balanza(escala):
+    ### Tabla del libro con `escala` veces los meses: los años de cada copia se desplazan hacia
+    ### atrás mientras quepan en datetime64[ns] (desde 1678); después se repiten los mismos años
+    bruto = libros.hoja('balanza', 'Balanza_comercial')
+    años = bruto.index.dropna()
+    paso = int(años.max() - años.min() + 1)
+    copias = max(1, int(años.min() - (pd.Timestamp.min.year + 1)) // paso + 1)
+    return (pd.concat([bruto.set_axis(bruto.index - (i % copias) * paso) for i in range(escala)]),)
+
+
+def _preparar_concentracion(escala):
+    ### Hojas del libro de producción con `escala` veces los países de cada mineral
+    tablas = libros.cargar('recursopais')
+    return ({hoja: pd.concat([t.assign(Country=t['Country'] + ' #{}'.format(i)) if i else t
+                              for i in range(escala)], ignore_index=True)
+             for hoja, t in tablas.items()},)
+
+
+def _serie_años(serie, escala):
+    ### Serie anual con `escala` veces los años, extendida hacia atrás
+    valores = np.tile(serie.to_numpy(), escala)
+    fin = int(str(serie.index[-1])[:4])
+    return pd.Series(valores, index=pd.RangeIndex(fin - len(valores) + 1, fin + 1))
+
+
+def _preparar_data(escala):
+    series = [etapas.obtener('export'), etapas.obtener('pib'), etapas.obtener('pcobre')['media']]
+    return tuple(_serie_años(serie, escala) for serie in series)
+
+
+def _preparar_grafico(escala):
+    return (_serie_años(etapas.obtener('pcobre')['media'], escala).to_frame('Precio'),)
+
+
+def _preparar_grafico_bar(escala):
+    empresas = etapas.obtener('empresas')
+    totales = pd.concat([empresas['totales'].rename(lambda c: '{} #{}'.format(c, i)) for i in range(escala)])
+    return (totales.to_frame().transpose(),)
+
+
+# Procesamiento medido de cada caso
+
+def _carga_precios(contenido):
+    return fuentes._precios(io.BytesIO(contenido))
+
+
+def _pcobre(diario):
+    mensual = precios._acumular(diario)
+    anual = mensual.groupby(mensual.index.year.rename('año')).agg(precios.COMBINAR)
+    return precios._estadisticas(anual)
+
+
+def _compania(texto):
+    return fuentes._compania(io.StringIO(texto))
+
+
+def _data(export, pib, pcobre):
+    return precios.alinear(export, pib, pcobre, join='outer')
+
+
+def _dibujar(tipo, **parametros):
+    def dibujar(data):
+        fig = graficos.TIPOS[tipo](data=data, mostrar=False, **parametros)
+        fig.savefig(io.BytesIO(), format='png')
+        graficos.librerias()[0].close(fig)
+        return data
+    return dibujar
+
+
+### Nombre del caso: (preparación, procesamiento medido)
+CASOS = {
+    'carga_precios': (_preparar_carga_precios, _carga_precios),
+    'pcobre': (_preparar_pcobre, _pcobre),
+    'compania': (_preparar_compania, _compania),
+    'empresas': (_preparar_empresas, companias.construir),
+    'minerales_no': (_preparar_minerales_no, etapas._por_categoria),
+    'region': (_preparar_regiones, regiones.construir),
+    'balanza': (_preparar_balanza, bc.parsear),
+    'concentracion': (_preparar_concentracion, concentracion.construir),
+    'data': (_preparar_data, _data),
+    'grafico_lin': (_preparar_grafico, _dibujar('lin')),
+    'grafico_bar': (_preparar_grafico_bar, _dibujar('bar', rot=90)),
+}
+
+
+def medir(caso, escala=1, repeticiones=3):
+    """Mide ``caso`` con datos a ``escala``: tiempos, pico de memoria y filas de entrada y salida."""
+    preparar, procesar = CASOS[caso]
+    argumentos = preparar(escala)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = procesar(*argumentos)
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        procesar(*argumentos)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'caso': caso,
+        'escala': escala,
+        'filas_entrada': sum(_filas(a) for a in argumentos),
+        'filas_salida': _filas(resultado),
+        'segundos': min(tiempos),
+        'mediana': statistics.median(tiempos),
+        'memoria_pico': pico,
+    }
+
+
+def ejecutar(casos=None, escalas=(1,), repeticiones=3, graficar=True):
+    """Mide cada caso en cada escala y devuelve el informe (entorno y resultados).
+
+    Si un caso falla en una escala, su resultado lleva sólo la columna
+    ``error`` y se sigue con los demás.
+    """
+    casos = list(CASOS) if casos is None else casos
+    if graficar:
+        import matplotlib
+        matplotlib.use('Agg')
+    resultados = []
+    for caso in casos:
+        es_grafico = caso.startswith('grafico_')
+        for escala in escalas:
+            if es_grafico and (not graficar or escala > ESCALA_GRAFICOS):
+                continue
+            try:
+                resultados.append(medir(caso, escala, repeticiones))
+            except Exception as error:
+                resultados.append({'caso': caso, 'escala': escala, 'error': repr(error)})
+    return {
+        'entorno': {
+            'fecha': pd.Timestamp.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+        },
+        'resultados': resultados,
+    }
+
+
+def _medidos(informe):
+    ### Resultados de `informe` por (caso, escala), sin los casos que fallaron
+    return pd.DataFrame([r for r in informe['resultados'] if 'error' not in r],
+                        columns=['caso', 'escala', 'segundos', 'memoria_pico']).set_index(['caso', 'escala'])
+
+
+def comparar(informe, base, tolerancia=0.25, minimo=1e-3):
+    """Compara ``informe`` con ``base`` por (caso, escala).
+
+    Devuelve una tabla con el tiempo y memoria de ambos y su razón; la
+    columna ``regresion`` marca los casos más lentos que la base en más de
+    ``tolerancia`` (y en más de ``minimo`` segundos, para ignorar el ruido).
+    """
+    actual, anterior = _medidos(informe), _medidos(base)
+    df = actual[['segundos', 'memoria_pico']].join(
+        anterior[['segundos', 'memoria_pico']], rsuffix='_base', how='inner')
+    df['razon'] = df['segundos'] / df['segundos_base']
+    df['razon_memoria'] = df['memoria_pico'] / df['memoria_pico_base']
+    df['regresion'] = (df['razon'] > 1 + tolerancia) & (df['segundos'] - df['segundos_base'] > minimo)
+    return df
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), help='casos a medir (todos, por defecto)')
+    parser.add_argument('--escalas', nargs='+', type=int, default=[1], help='multiplicadores de los datos')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-graficos', action='store_true', help='omite los casos de gráficos')
+    parser.add_argument('--salida', help='archivo JSON con los resultados')
+    parser.add_argument('--base', help='archivo JSON de una medición anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help='aumento relativo de tiempo aceptado respecto de la base')
+    args = parser.parse_args(argumentos)
+
+    informe = ejecutar(args.casos, args.escalas, args.repeticiones, graficar=not args.sin_graficos)
+    tabla = pd.DataFrame(informe['resultados']).set_index(['caso', 'escala'])
+    print(tabla.to_string())
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+    if args.base:
+        with open(args.base, encoding='utf-8') as f:
+            comparacion = comparar(informe, json.load(f), args.tolerancia)
+        print(comparacion.to_string())
+        if comparacion['regresion'].any():
+            return 1
+    if 'error' in tabla:
+        print(tabla['error'].dropna().to_string(), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
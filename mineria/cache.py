@@ -0,0 +1,160 @@
+"""Caché columnar de las fuentes de datos.
+
+Cada fuente se procesa una sola vez y se guarda como Parquet (o pickle, si
+``pyarrow`` no está instalado) en ``.cache/``, junto a un archivo ``.json``
+con la huella del archivo original (mtime, tamaño y SHA-256). Mientras la
+huella no cambie, las siguientes lecturas salen directamente de la caché.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+# Raíz del repositorio (las rutas de las fuentes son relativas a ella)
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Directorio de la caché, configurable por variable de entorno
+DIRECTORIO = Path(os.environ.get('MINERIA_CACHE', RAIZ / '.cache'))
+
+try:
+    import pyarrow  # noqa: F401
+    FORMATO = 'parquet'
+except ImportError:
+    FORMATO = 'pickle'
+
+
+def sha256(ruta, bloque=1 << 20):
+    """Hash SHA-256 del contenido de ``ruta``."""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for trozo in iter(lambda: f.read(bloque), b''):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def huella(ruta):
+    """Huella de ``ruta``: mtime, tamaño y hash del contenido."""
+    estado = os.stat(ruta)
+    return {'mtime': estado.st_mtime_ns, 'tamaño': estado.st_size, 'sha256': sha256(ruta)}
+
+
+def _rutas(nombre):
+    return (DIRECTORIO / '{}.{}'.format(nombre, FORMATO),
+            DIRECTORIO / '{}.json'.format(nombre))
+
+
+def _vigente(meta, ruta, version):
+    """Indica si los metadatos ``meta`` siguen describiendo a ``ruta``.
+
+    Si mtime y tamaño coinciden no se vuelve a leer el archivo; si sólo
+    cambió el mtime (p. ej. tras un ``git checkout``), se compara el hash.
+    """
+    if meta.get('version') != version:
+        return False
+    estado = os.stat(ruta)
+    if meta['mtime'] == estado.st_mtime_ns and meta['tamaño'] == estado.st_size:
+        return True
+    return meta['tamaño'] == estado.st_size and meta['sha256'] == sha256(ruta)
+
+
+def vigentes(nombre, ruta, version=1):
+    """Metadatos guardados de ``nombre`` si siguen describiendo a ``ruta``; si no, ``None``."""
+    _, metadatos = _rutas(nombre)
+    if not metadatos.exists():
+        return None
+    meta = json.loads(metadatos.read_text())
+    if not _vigente(meta, ruta, version):
+        return None
+    if meta['mtime'] != os.stat(ruta).st_mtime_ns:
+        # Mismo contenido con otro mtime: se actualiza para no volver a hashear
+        meta['mtime'] = os.stat(ruta).st_mtime_ns
+        metadatos.write_text(json.dumps(meta))
+    return meta
+
+
+def metadatos(nombre):
+    """Metadatos guardados de ``nombre`` (vigentes o no), o ``None`` si no hay."""
+    _, ruta = _rutas(nombre)
+    return json.loads(ruta.read_text()) if ruta.exists() else None
+
+
+def leer(nombre, ruta, version=1):
+    """Devuelve el dataframe cacheado de ``nombre`` o ``None`` si no es vigente."""
+    datos, _ = _rutas(nombre)
+    if not datos.exists() or vigentes(nombre, ruta, version) is None:
+        return None
+    return leer_tabla(nombre)
+
+
+def existe(nombre):
+    """Indica si la tabla ``nombre`` está en la caché (en el formato actual)."""
+    return _rutas(nombre)[0].exists()
+
+
+def leer_tabla(nombre):
+    """Lee la tabla ``nombre`` de la caché, sin validar contra ninguna fuente."""
+    datos, _ = _rutas(nombre)
+    if not datos.exists():
+        return None
+    if FORMATO == 'parquet':
+        return pd.read_parquet(datos)
+    return pd.read_pickle(datos)
+
+
+def guardar_tabla(nombre, df):
+    """Guarda ``df`` en la caché como ``nombre``, sin metadatos."""
+    DIRECTORIO.mkdir(parents=True, exist_ok=True)
+    datos, _ = _rutas(nombre)
+    if FORMATO == 'parquet':
+        df.to_parquet(datos)
+    else:
+        df.to_pickle(datos)
+
+
+def guardar_metadatos(nombre, ruta, version=1, **extra):
+    """Guarda la huella actual de ``ruta`` (y los datos de ``extra``) como metadatos de ``nombre``."""
+    DIRECTORIO.mkdir(parents=True, exist_ok=True)
+    _, metadatos = _rutas(nombre)
+    meta = huella(ruta)
+    meta['version'] = version
+    meta.update(extra)
+    metadatos.write_text(json.dumps(meta))
+
+
+def guardar(nombre, ruta, df, version=1):
+    """Guarda ``df`` en la caché con la huella actual de ``ruta``."""
+    guardar_tabla(nombre, df)
+    guardar_metadatos(nombre, ruta, version)
+
+
+def eliminar(nombre):
+    """Elimina la tabla ``nombre`` y sus metadatos de la caché."""
+    for archivo in _rutas(nombre):
+        if archivo.exists():
+            archivo.unlink()
+
+
+def cacheado(nombre, ruta, lector, version=1, refrescar=False):
+    """Lee ``nombre`` desde la caché o, si cambió ``ruta``, lo reconstruye con ``lector``."""
+    ruta = RAIZ / ruta
+    if not refrescar:
+        df = leer(nombre, ruta, version)
+        if df is not None:
+            return df
+    df = lector(ruta)
+    guardar(nombre, ruta, df, version)
+    return df
+
+
+def limpiar():
+    """Elimina todos los archivos de la caché, incluidos sus subdirectorios (p. ej. ``etapas/``)."""
+    if DIRECTORIO.exists():
+        for archivo in DIRECTORIO.iterdir():
+            if archivo.is_dir():
+                shutil.rmtree(archivo)
+            else:
+                archivo.unlink()
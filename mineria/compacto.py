@@ -0,0 +1,305 @@
+"""Representación compacta en memoria de las tablas procesadas.
+
+``compactar`` reduce la memoria de una tabla (o de un diccionario de tablas,
+como los índices de ``regiones`` o ``companias``) sin cambiar sus valores
+más allá de ``tolerancia``:
+
+* Las columnas de texto y las categóricas pasan a categóricas sobre un
+  diccionario de claves compartido por todas las tablas (países, minerales,
+  compañías, categorías, códigos ``DTI_*``): cada tabla guarda sólo los
+  códigos. El diccionario sólo crece agregando claves al final, por lo que
+  los códigos de las tablas ya compactadas siguen siendo válidos; al crecer,
+  los resultados memoizados por ``obtener`` pasan al diccionario nuevo, de
+  modo que en memoria queda uno solo.
+* Los enteros se reducen al tipo más chico que los contiene y los
+  ``float64`` pasan a ``float32`` si el error relativo no supera
+  ``tolerancia``.
+* Los ejes de años (índices o columnas de años como texto, enteros o fechas
+  al 1 de enero) pasan a enteros (de 16 bits si la versión de pandas admite
+  índices ``int16``), y tablas con los mismos años comparten el mismo
+  objeto índice.
+
+``tablas`` compacta los resultados de las etapas (ampliando el diccionario
+una sola vez con las claves de todas) y devuelve un informe de bytes
+ahorrados por tabla. Con la variable de entorno ``MINERIA_COMPACTO=1``,
+``mineria.obtener`` devuelve las tablas ya compactadas.
+"""
+
+import os
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from . import etapas
+
+# Modo compacto de mineria.obtener
+ACTIVO = os.environ.get('MINERIA_COMPACTO', '') not in ('', '0')
+
+# Error relativo aceptado al pasar de float64 a float32
+TOLERANCIA = 1e-6
+
+# Nombres de ejes y columnas de años
+AÑOS = {'año', 'Año', 'Year', 'year'}
+
+# Diccionario de claves compartido; cada ampliación crea un índice nuevo cuyo prefijo es el anterior.
+# Las versiones se registran con referencias débiles para reconocerlas sin mantenerlas en memoria
+_diccionario = pd.Index([], dtype=object)
+_versiones = {id(_diccionario): weakref.ref(_diccionario)}
+
+# Ejes de años ya creados, por (nombre, valores)
+_ejes = {}
+
+# Resultados compactados de las etapas: nombre -> (clave, valor)
+_memoria = {}
+
+
+def diccionario():
+    """Diccionario de claves compartido actual."""
+    return _diccionario
+
+
+def _es_texto(valores):
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        return pd.api.types.infer_dtype(valores.dtype.categories) in ('string', 'empty')
+    return (valores.dtype == object or isinstance(valores.dtype, pd.StringDtype)) and \
+        pd.api.types.infer_dtype(valores, skipna=True) in ('string', 'empty')
+
+
+def _ampliar(textos):
+    ### Agrega al final del diccionario las claves que aún no tiene; los resultados memoizados
+    ### pasan al diccionario nuevo para no mantener en memoria las versiones anteriores
+    global _diccionario
+    nuevas = pd.Index(sorted(set(textos)), dtype=object).difference(_diccionario, sort=False)
+    if len(nuevas):
+        _diccionario = _diccionario.append(nuevas)
+        _versiones[id(_diccionario)] = weakref.ref(_diccionario)
+        tipo = pd.CategoricalDtype(_diccionario)
+        for nombre, (clave, valor) in _memoria.items():
+            _memoria[nombre] = (clave, _recategorizar(valor, tipo))
+    return pd.CategoricalDtype(_diccionario)
+
+
+def _claves(valor):
+    ### Claves de texto que `compactar` pasaría al diccionario, en una lista de series
+    if isinstance(valor, dict):
+        return [c for v in valor.values() for c in _claves(v)]
+    if isinstance(valor, pd.Series):
+        columnas = [valor] if _es_texto(valor) else []
+    elif isinstance(valor, pd.DataFrame):
+        columnas = [valor.iloc[:, i] for i in range(valor.shape[1]) if _es_texto(valor.iloc[:, i])]
+    else:
+        return []
+    eje = valor.index
+    if not isinstance(eje, pd.MultiIndex) and _años(eje) is None and _es_texto(eje):
+        columnas.append(eje.to_series())
+    return [c.dropna().astype(str) for c in columnas if not _compartida(c)]
+
+
+def _recategorizar(valor, tipo):
+    ### `valor` con sus categóricas de versiones anteriores del diccionario pasadas a `tipo`
+    ### (los códigos no cambian, porque cada versión es prefijo de la siguiente)
+    if isinstance(valor, dict):
+        return {clave: _recategorizar(v, tipo) for clave, v in valor.items()}
+    if not isinstance(valor, (pd.Series, pd.DataFrame)):
+        return valor
+    eje = valor.index
+    if isinstance(eje, pd.CategoricalIndex) and _es_version(eje.categories) and eje.categories is not tipo.categories:
+        valor = valor.set_axis(pd.CategoricalIndex(pd.Categorical.from_codes(eje.codes, dtype=tipo), name=eje.name))
+    series = [valor] if isinstance(valor, pd.Series) else [valor.iloc[:, i] for i in range(valor.shape[1])]
+    nuevas = [pd.Series(pd.Categorical.from_codes(s.cat.codes, dtype=tipo), index=s.index, name=s.name)
+              if _compartida(s) and s.dtype.categories is not tipo.categories else s for s in series]
+    if isinstance(valor, pd.Series):
+        return nuevas[0]
+    if all(n is s for n, s in zip(nuevas, series)):
+        return valor
+    df = pd.DataFrame({i: serie for i, serie in enumerate(nuevas)})
+    df.columns = valor.columns
+    df.index = valor.index
+    return df
+
+
+def _diccionarios(valor, vistos=None):
+    ### Versiones del diccionario que usa `valor`, por id
+    vistos = {} if vistos is None else vistos
+    if isinstance(valor, dict):
+        for v in valor.values():
+            _diccionarios(v, vistos)
+    elif isinstance(valor, (pd.Series, pd.DataFrame)):
+        series = [valor] if isinstance(valor, pd.Series) else [valor.iloc[:, i] for i in range(valor.shape[1])]
+        categorias = [s.dtype.categories for s in series if _compartida(s)]
+        if isinstance(valor.index, pd.CategoricalIndex):
+            categorias.append(valor.index.categories)
+        vistos.update({id(c): c for c in categorias if _es_version(c)})
+    return vistos
+
+
+def _es_version(categorias):
+    ref = _versiones.get(id(categorias))
+    return ref is not None and ref() is categorias
+
+
+def _compartida(valores):
+    return isinstance(valores.dtype, pd.CategoricalDtype) and _es_version(valores.dtype.categories)
+
+
+def _a_categorica(valores, tipo):
+    return pd.Categorical(np.asarray(valores.astype(object).where(pd.notna(valores), None)), dtype=tipo)
+
+
+def _años(eje):
+    ### Años de `eje` como enteros, o None si no es un eje de años
+    if isinstance(eje, pd.DatetimeIndex):
+        if len(eje) and (eje == eje.to_period('Y').to_timestamp()).all():
+            return eje.year.to_numpy()
+        return None
+    if pd.api.types.is_integer_dtype(eje.dtype):
+        return eje.to_numpy() if eje.name in AÑOS else None
+    if eje.dtype == object and len(eje):
+        texto = pd.Index(eje).astype(str)
+        if texto.str.fullmatch(r'\d{4}').all():
+            return texto.astype(int).to_numpy()
+    return None
+
+
+def _eje_años(eje):
+    ### Eje de años compartido (int16) para `eje`, o `eje` sin cambios
+    años = _años(eje)
+    if años is None or años.min() < np.iinfo('int16').min or años.max() > np.iinfo('int16').max:
+        return eje
+    años = años.astype('int16')
+    llave = (eje.name, años.tobytes())
+    if llave not in _ejes:
+        _ejes[llave] = pd.Index(años, name=eje.name)
+    return _ejes[llave]
+
+
+def _eje(eje):
+    if isinstance(eje, pd.MultiIndex):
+        niveles = [_eje_años(nivel) if _años(nivel) is not None else nivel for nivel in eje.levels]
+        return eje.set_levels(niveles, verify_integrity=False)
+    compartido = _eje_años(eje)
+    if compartido is not eje:
+        return compartido
+    if _es_texto(eje) and not _compartida(eje):
+        return pd.CategoricalIndex(_a_categorica(eje.to_series(), _ampliar(eje.dropna())), name=eje.name)
+    return eje
+
+
+def _numerica(valores, tolerancia):
+    ### `valores` con el tipo numérico más chico que conserva sus valores
+    if pd.api.types.is_bool_dtype(valores.dtype):
+        return valores
+    if isinstance(valores.dtype, pd.api.extensions.ExtensionDtype):
+        if not pd.api.types.is_integer_dtype(valores.dtype):
+            return valores
+        datos = valores.dropna()
+        for tipo in ['Int8', 'Int16', 'Int32']:
+            limites = np.iinfo(tipo.lower())
+            if datos.empty or (datos.min() >= limites.min and datos.max() <= limites.max):
+                return valores.astype(tipo)
+        return valores
+    if pd.api.types.is_integer_dtype(valores.dtype):
+        return pd.to_numeric(valores, downcast='integer')
+    if valores.dtype == 'float64':
+        reducidos = valores.astype('float32')
+        with np.errstate(over='ignore', invalid='ignore'):
+            if np.allclose(reducidos.astype('float64'), valores, rtol=tolerancia, atol=0, equal_nan=True):
+                return reducidos
+    return valores
+
+
+def _serie(serie, tolerancia, tipo=None):
+    if _es_texto(serie):
+        return serie if _compartida(serie) else pd.Series(_a_categorica(serie, tipo), index=serie.index,
+                                                           name=serie.name)
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return _numerica(serie, tolerancia)
+    return serie
+
+
+def compactar(valor, tolerancia=TOLERANCIA):
+    """Versión compacta de ``valor`` (tabla, serie o diccionario de ellas); el original no cambia."""
+    ### El diccionario se amplía una vez con todas las claves de `valor`, que queda con una sola versión
+    claves = _claves(valor)
+    if claves:
+        _ampliar(pd.concat(claves))
+    return _compactar(valor, tolerancia)
+
+
+def _compactar(valor, tolerancia):
+    if isinstance(valor, dict):
+        return {clave: _compactar(v, tolerancia) for clave, v in valor.items()}
+    if isinstance(valor, pd.Series):
+        tipo = _ampliar(valor.dropna().astype(str)) if _es_texto(valor) else None
+        return _serie(valor, tolerancia, tipo).set_axis(_eje(valor.index))
+    if not isinstance(valor, pd.DataFrame):
+        return valor
+    textos = [c for c in valor.columns if _es_texto(valor[c])]
+    tipo = _ampliar(pd.concat([valor[c].dropna().astype(str) for c in textos])) if textos else None
+    df = pd.DataFrame({i: _serie(valor.iloc[:, i], tolerancia, tipo) for i in range(valor.shape[1])})
+    df.columns = valor.columns
+    df.index = _eje(valor.index)
+    compartido = _eje_años(valor.columns)
+    if compartido is not valor.columns:
+        df.columns = compartido
+    return df
+
+
+def tamaño(valor):
+    """Bytes de ``valor``; el diccionario compartido no se cuenta (ver ``informe``)."""
+    if isinstance(valor, dict):
+        return sum(tamaño(v) for v in valor.values())
+    if isinstance(valor, pd.Series):
+        return _bytes(valor) + _bytes_eje(valor.index)
+    if isinstance(valor, pd.DataFrame):
+        return sum(_bytes(valor.iloc[:, i]) for i in range(valor.shape[1])) + _bytes_eje(valor.index)
+    return 0
+
+
+def _bytes(serie):
+    if _compartida(serie):
+        return serie.cat.codes.nbytes
+    return int(serie.memory_usage(deep=True, index=False))
+
+
+def _bytes_eje(eje):
+    if isinstance(eje, pd.CategoricalIndex) and _es_version(eje.categories):
+        return eje.codes.nbytes
+    return int(eje.memory_usage(deep=True))
+
+
+def informe(originales, compactadas):
+    """Bytes antes y después de compactar cada tabla, con el diccionario compartido aparte.
+
+    El diccionario se cuenta una vez por cada versión que usan las tablas
+    compactadas (una sola si se compactaron con ``tablas`` u ``obtener``).
+    """
+    filas = {nombre: (tamaño(originales[nombre]), tamaño(compactadas[nombre])) for nombre in originales}
+    diccionarios = _diccionarios(compactadas).values()
+    filas['(diccionario compartido)'] = (0, sum(int(d.memory_usage(deep=True)) for d in diccionarios))
+    df = pd.DataFrame.from_dict(filas, orient='index', columns=['antes', 'despues'])
+    df.loc['Total'] = df.sum()
+    df['ahorro'] = df['antes'] - df['despues']
+    df['ahorro_pct'] = df['ahorro'] / df['antes'].where(df['antes'] > 0) * 100
+    return df
+
+
+def tablas(nombres=None, tolerancia=TOLERANCIA):
+    """Resultados compactados de las etapas ``nombres`` (todas, por defecto) y su ``informe``."""
+    nombres = list(etapas.ETAPAS) if nombres is None else nombres
+    originales = {nombre: etapas.obtener(nombre) for nombre in nombres}
+    claves = _claves(originales)
+    if claves:
+        _ampliar(pd.concat(claves))
+    compactadas = {nombre: obtener(nombre, tolerancia=tolerancia) for nombre in nombres}
+    return compactadas, informe(originales, compactadas)
+
+
+def obtener(nombre, refrescar=False, tolerancia=TOLERANCIA):
+    """Resultado compactado de la etapa ``nombre``, recalculado sólo si cambió la etapa."""
+    actual = (etapas.clave(nombre), tolerancia)
+    if refrescar or nombre not in _memoria or _memoria[nombre][0] != actual:
+        valor = compactar(etapas.obtener(nombre, refrescar), tolerancia)
+        _memoria[nombre] = (actual, valor)
+    return _memoria[nombre][1]
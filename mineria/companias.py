@@ -0,0 +1,103 @@
+"""Producción de cobre por compañía y grupo (INE, ``cobre/compania.csv``).
+
+``construir`` clasifica una sola vez cada columna de la tabla de compañías
+en un grupo (división de CODELCO, operador privado u otros) y precalcula la
+producción por año, la acumulada, el total por compañía y los totales por
+grupo. Las consultas por umbral, por ranking o por grupo, y las sumas sobre
+una ventana de años (diferencia de dos filas de la acumulada), son búsquedas
+sobre esos arreglos, sin volver a recorrer nombres ni sumar la tabla.
+"""
+
+import numpy as np
+import pandas as pd
+
+CODELCO = 'CODELCO'
+PRIVADA = 'Privada'
+OTROS = 'Otros'
+GRUPOS = [CODELCO, PRIVADA, OTROS]
+
+
+def _grupos(nombres):
+    ### Las divisiones de CODELCO empiezan con 'División'; 'OTROS / Other' agrupa al resto
+    nombres = pd.Index(nombres).str.strip()
+    codigos = np.select([nombres.str.startswith('División'), nombres.str.startswith('OTROS')], [0, 2], 1)
+    return pd.Categorical.from_codes(codigos, categories=GRUPOS)
+
+
+def construir(compania):
+    """Índice de compañías desde la tabla ``compania`` (un año por fila, la última columna es el total).
+
+    Devuelve un diccionario con:
+
+    * ``anual`` y ``acumulada``: producción por año y compañía (sin el total).
+    * ``grupos``: grupo de cada compañía (categórico, ver ``GRUPOS``).
+    * ``totales`` y ``maximos``: producción total de cada compañía y máximo
+      de su producción anual.
+    * ``por_grupo`` y ``por_grupo_acumulada``: producción por año y grupo.
+    * ``total``: producción nacional por año.
+    """
+    anual = compania.iloc[:, :-1]
+    anual = anual.set_axis(pd.Index(anual.index).astype(int).rename('Año'))
+    valores = anual.to_numpy(dtype='float64')
+    acumulada = np.cumsum(valores, axis=0)
+    grupos = pd.Series(_grupos(anual.columns), index=anual.columns, name='grupo')
+
+    ### Suma por grupo como producto por la matriz indicadora compañía x grupo
+    indicadora = np.eye(len(GRUPOS))[grupos.cat.codes.to_numpy()]
+    por_grupo = pd.DataFrame(valores @ indicadora, index=anual.index, columns=GRUPOS)
+    return {
+        'anual': anual,
+        'acumulada': pd.DataFrame(acumulada, index=anual.index, columns=anual.columns),
+        'grupos': grupos,
+        'totales': pd.Series(valores.sum(axis=0), index=anual.columns),
+        'maximos': pd.Series(valores.max(axis=0), index=anual.columns),
+        'por_grupo': por_grupo,
+        'por_grupo_acumulada': por_grupo.cumsum(),
+        'total': pd.Series(valores.sum(axis=1), index=anual.index, name='Total'),
+    }
+
+
+def _ventana(indice, clave, desde, hasta):
+    ### Suma entre `desde` y `hasta` (incluidos) como diferencia de filas de la acumulada
+    acumulada = indice[clave]
+    valores = acumulada.to_numpy()
+    inicio = 0 if desde is None else acumulada.index.get_loc(desde)
+    fin = len(valores) - 1 if hasta is None else acumulada.index.get_loc(hasta)
+    suma = valores[fin] - (valores[inicio - 1] if inicio > 0 else 0)
+    return pd.Series(suma, index=acumulada.columns)
+
+
+def produccion(indice, desde=None, hasta=None, grupo=None):
+    """Producción de cada compañía entre ``desde`` y ``hasta`` (de ``grupo``, si se indica)."""
+    if desde is None and hasta is None:
+        df = indice['totales']
+    else:
+        df = _ventana(indice, 'acumulada', desde, hasta)
+    return df if grupo is None else df[(indice['grupos'] == grupo).to_numpy()]
+
+
+def por_grupo(indice, desde=None, hasta=None):
+    """Producción de cada grupo entre ``desde`` y ``hasta``."""
+    if desde is None and hasta is None:
+        return indice['por_grupo'].sum()
+    return _ventana(indice, 'por_grupo_acumulada', desde, hasta)
+
+
+def miembros(indice, grupo):
+    """Compañías de ``grupo``."""
+    return indice['grupos'].index[(indice['grupos'] == grupo).to_numpy()]
+
+
+def sobre(indice, umbral, medida='totales'):
+    """Compañías cuya ``medida`` (``totales`` o ``maximos``) supera ``umbral``.
+
+    Como la producción no es negativa, la acumulada de una compañía supera
+    ``umbral`` en algún año si y sólo si su total lo supera.
+    """
+    serie = indice[medida]
+    return serie.index[serie.to_numpy() > umbral]
+
+
+def top(indice, n=10, desde=None, hasta=None, grupo=None):
+    """Las ``n`` compañías de mayor producción entre ``desde`` y ``hasta``."""
+    return produccion(indice, desde, hasta, grupo).nlargest(n)
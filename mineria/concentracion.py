@@ -0,0 +1,140 @@
+"""Concentración de mercado por mineral y año (World Mining Data).
+
+A partir de la producción por país de cada mineral (libro
+``paises/recursopais.xlsx``, una hoja por mineral con los años 2015-2019)
+``construir`` arma un arreglo denso (mineral, país, año) y calcula en una
+sola pasada de NumPy, para todos los minerales y años a la vez:
+
+* la cuota de cada país en la producción mundial (%),
+* el ranking de cada país y su cambio respecto del año anterior,
+* la cuota acumulada por ranking, de la que sale la razón de concentración
+  de los ``n`` primeros países (CR\\ :sub:`n`) para cualquier ``n``,
+* el índice Herfindahl-Hirschman (suma de las cuotas en % al cuadrado, el
+  mismo que la columna ``Share HHI`` del BGR).
+
+El resultado se guarda como etapa
+(``etapas.obtener('concentracion_mercados')``) y las funciones de consulta
+son filtros sobre esas tablas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import libros
+
+# Razones de concentración incluidas en la tabla de mercados
+TOPS = [1, 3, 5, 10]
+
+
+def _largo(tablas):
+    ### Producción por (mineral, país) en filas y un año por columna, sin la fila Total
+    df = pd.concat(tablas, names=['mineral', None]).reset_index(level=0)
+    df = df[df['Country'] != 'Total']
+    años = [c for c in df.columns if str(c).isdigit()]
+    return df, años
+
+
+def construir(tablas=None):
+    """Índice de concentración desde ``tablas`` (hoja -> producción por país y año).
+
+    Por defecto se usan todas las hojas de ``paises/recursopais.xlsx``.
+    Devuelve un diccionario con:
+
+    * ``paises``: por (mineral, país, año), producción, cuota, ranking,
+      cambio de ranking (positivo si el país subió) y cuota acumulada.
+    * ``mercados``: por (mineral, año), unidad, producción total, número
+      de países productores, HHI y CR de ``TOPS``.
+    """
+    tablas = libros.cargar('recursopais') if tablas is None else tablas
+    df, años = _largo(tablas)
+    minerales = pd.Categorical(df['mineral'], categories=list(tablas))
+    paises = pd.Categorical(df['Country'].astype(str).str.strip())
+    valores = df[años].to_numpy(dtype='float64')
+
+    ### Arreglo denso (mineral, país, año); un país sin dato produce 0
+    produccion = np.zeros((len(minerales.categories), len(paises.categories), len(años)))
+    np.add.at(produccion, (minerales.codes, paises.codes), np.nan_to_num(valores))
+    total = produccion.sum(axis=1, keepdims=True)
+    ### Cuota 0 donde no hay producción mundial (esas celdas no quedan en las tablas)
+    cuota = np.divide(produccion, total, out=np.zeros_like(produccion), where=total > 0)
+    cuota *= 100
+
+    ### Ranking por mineral y año (1 = mayor productor); los países sin producción no tienen ranking
+    produce = produccion > 0
+    orden = np.argsort(-cuota, axis=1, kind='stable')
+    rank = np.empty(orden.shape)
+    np.put_along_axis(rank, orden, np.arange(1, orden.shape[1] + 1, dtype='float64')[None, :, None], axis=1)
+    rank[~produce] = np.nan
+    cambio = np.full_like(rank, np.nan)
+    np.subtract(rank[:, :, :-1], rank[:, :, 1:], out=cambio[:, :, 1:])
+    acumulada_orden = np.cumsum(np.take_along_axis(cuota, orden, axis=1), axis=1)
+    acumulada = np.empty_like(acumulada_orden)
+    np.put_along_axis(acumulada, orden, acumulada_orden, axis=1)
+    del orden
+
+    hhi = (cuota ** 2).sum(axis=1)
+    productores = produce.sum(axis=1)
+    con_total = total[:, 0, :] > 0
+
+    ### La tabla por país se arma sólo con las celdas con producción (en el orden del arreglo denso)
+    celdas = np.nonzero(produce)
+    indice = pd.MultiIndex(
+        levels=[minerales.categories, paises.categories, pd.Index(años).astype(int)], codes=celdas,
+        names=['mineral', 'pais', 'año'], verify_integrity=False)
+    tabla_paises = pd.DataFrame({
+        'produccion': produccion[celdas],
+        'cuota': cuota[celdas],
+        'rank': pd.array(rank[celdas], dtype='Int64'),
+        'cambio_rank': pd.array(cambio[celdas], dtype='Int64'),
+        'cuota_acumulada': acumulada[celdas],
+    }, index=indice)
+
+    unidades = df.groupby(minerales, observed=False)['unit'].first().astype(str).to_numpy()
+    mercados = pd.DataFrame({
+        'unidad': np.repeat(unidades, len(años)),
+        'produccion': total[:, 0, :].ravel(),
+        'paises': productores.ravel(),
+        'hhi': np.where(con_total, hhi, np.nan).ravel(),
+    }, index=pd.MultiIndex.from_product([minerales.categories, pd.Index(años).astype(int)],
+                                        names=['mineral', 'año']))
+    for n in TOPS:
+        cr = acumulada_orden[:, min(n, acumulada_orden.shape[1]) - 1, :]
+        mercados['cr{}'.format(n)] = np.where(con_total, cr, np.nan).ravel()
+    mercados['unidad'] = mercados['unidad'].astype('category')
+    return {'paises': tabla_paises.sort_index(), 'mercados': mercados}
+
+
+def hhi(indice, mineral=None):
+    """HHI por año (filas) y mineral (columnas), o la serie de ``mineral``."""
+    tabla = indice['mercados']['hhi'].unstack('mineral')
+    return tabla if mineral is None else tabla[mineral]
+
+
+def concentracion(indice, n, año=None):
+    """Cuota (%) de los ``n`` mayores productores de cada mineral, por año (o en ``año``)."""
+    paises = indice['paises']
+    rank = paises['rank'].to_numpy(dtype='float64')
+    ### Para cada (mineral, año), la cuota acumulada del último país con ranking <= n
+    tops = paises[rank <= n].groupby(level=['mineral', 'año'], observed=True)['cuota_acumulada'].max()
+    tabla = tops.unstack('mineral')
+    return tabla if año is None else tabla.loc[año]
+
+
+def top(indice, mineral, año, n=10):
+    """Los ``n`` mayores productores de ``mineral`` en ``año``, ordenados por ranking."""
+    df = indice['paises'].xs((mineral, año), level=['mineral', 'año'])
+    return df[df['rank'] <= n].sort_values('rank')
+
+
+def cambios(indice, mineral, desde, hasta):
+    """Ranking de cada país en ``desde`` y ``hasta`` y los puestos que ganó (positivo) o perdió."""
+    rank = indice['paises'].xs(mineral, level='mineral')['rank'].unstack('año')
+    df = rank[[desde, hasta]].set_axis(['rank_' + str(desde), 'rank_' + str(hasta)], axis=1)
+    df['cambio'] = df.iloc[:, 0] - df.iloc[:, 1]
+    return df.sort_values(df.columns[1])
+
+
+def riesgo(indice, año, umbral=2500):
+    """Minerales con HHI sobre ``umbral`` en ``año`` (mercado muy concentrado), de mayor a menor."""
+    mercados = indice['mercados'].xs(año, level='año')
+    return mercados[mercados['hhi'] > umbral].sort_values('hhi', ascending=False)
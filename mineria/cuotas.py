@@ -0,0 +1,63 @@
+"""Cuota de producción mundial por mineral y país (World Mining Data).
+
+Reúne las hojas del libro ``paises/compartepais.xlsx`` (un mineral por hoja,
+ver ``mineria.libros``) en una sola tabla larga indexada por (mineral, país),
+con columnas numéricas reales. Los minerales son las hojas del libro y se
+nombran como ellas; los de ``SIMBOLOS`` también se aceptan por su símbolo.
+"""
+
+import pandas as pd
+
+from . import libros
+
+# Columnas originales del BGR y su nombre en la tabla larga
+COLUMNAS = {'Rank 2019': 'rank', 'Rank 2018': 'rank_anterior', 'Country': 'pais', 'unit': 'unidad',
+            'Production 2019': 'produccion', 'Share in %': 'cuota', 'Share cum.%': 'cuota_acumulada',
+            'Share HHI': 'hhi'}
+
+# Símbolos abreviados de algunas hojas (los del análisis original: Cu, Ag, Au, Mo y Fe)
+SIMBOLOS = {'ag': 'Silver', 'au': 'Gold', 'cu': 'Copper', 'fe': 'Iron (Fe)', 'mo': 'Molybdenum'}
+
+
+def hoja(mineral):
+    """Nombre de la hoja de ``mineral`` (símbolo o nombre de la hoja)."""
+    return SIMBOLOS.get(mineral, mineral)
+
+
+def tabla(minerales=None):
+    """Tabla larga de cuotas por (mineral, país), ordenada por ranking dentro de cada mineral.
+
+    Por defecto incluye todas las hojas del libro. Se excluye la fila
+    ``Total`` de cada hoja; los totales por mineral se obtienen con
+    ``totales``.
+    """
+    hojas = libros.cargar('compartepais', None if minerales is None else [hoja(m) for m in minerales])
+    df = pd.concat(hojas, names=['mineral', None]).reset_index(level=0)
+    df = df.rename(columns=COLUMNAS)
+    df = df[df['pais'] != 'Total']
+    df['mineral'] = pd.Categorical(df['mineral'], categories=list(hojas))
+    df['rank'] = df['rank'].astype('int64')
+    df['rank_anterior'] = pd.to_numeric(df['rank_anterior'].str.extract(r'(\d+)', expand=False)).astype('Int64')
+    df['produccion'] = df['produccion'].astype(float)
+    return df.set_index(['mineral', 'pais']).sort_values(['mineral', 'rank'])
+
+
+def totales(cuotas):
+    """Producción mundial e índice HHI de cada mineral."""
+    return cuotas.groupby(level='mineral', observed=True).agg(
+        unidad=('unidad', 'first'), produccion=('produccion', 'sum'), hhi=('hhi', 'sum'),
+        paises=('produccion', 'size'))
+
+
+def de(cuotas, mineral, n=None):
+    """Ranking de países para ``mineral`` (los ``n`` primeros, si se indica).
+
+    ``mineral`` puede ser el nombre de la hoja o su símbolo (``'cu'``).
+    """
+    df = cuotas.xs(hoja(mineral), level='mineral').reset_index()
+    return df if n is None else df[:n]
+
+
+def posiciones(cuotas, pais):
+    """Ranking y cuota de ``pais`` en cada mineral."""
+    return cuotas.xs(pais, level='pais')[['rank', 'cuota', 'produccion', 'unidad']]
@@ -0,0 +1,143 @@
+"""Estadísticas de la producción de cobre de Chile frente a la mundial.
+
+``panel`` reúne por año la producción mundial y chilena (Cochilco,
+``cobre/produccion_comparativa.csv``), la participación de Chile, el precio
+del cobre y los indicadores del Banco Mundial. ``ventana`` calcula sobre ese
+panel las estadísticas móviles de una ventana de ``n`` años: CAGR, medias y
+desviaciones estándar, y la correlación de la producción chilena con el
+precio, el aporte al PIB y las exportaciones. Las ventanas se arman con
+vistas de NumPy (sin copiar ni recorrer año por año) y el resultado de cada
+ventana se guarda en la caché, de modo que un informe con muchas ventanas no
+vuelve a calcularlas mientras no cambien las fuentes.
+"""
+
+import hashlib
+import inspect
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from . import cache, etapas
+
+# Columnas del panel con media y desviación móvil
+MOVILES = ['mundial', 'chile', 'cuota', 'precio']
+
+# Series con las que se correlaciona la producción chilena
+RELACIONADAS = ['precio', 'pib', 'export']
+
+# Resultados ya calculados en este proceso: n -> (clave, tabla)
+_memoria = {}
+
+# Hash del código de este módulo (entra en la clave de cada ventana), calculado al primer uso
+_codigo = None
+
+
+def panel():
+    """Panel anual: producción mundial y chilena, cuota (%), precio, pib y export."""
+    return etapas.obtener('panel_cobre')
+
+
+def _ventanas(valores, n):
+    """Ventanas de ``n`` filas que terminan en cada fila de ``valores``.
+
+    Para una matriz de forma ``(años, columnas)`` devuelve una vista de forma
+    ``(años, columnas, n)``; las primeras ``n - 1`` ventanas se completan con
+    ``NaN``, por lo que sus estadísticas quedan en ``NaN``.
+    """
+    valores = np.asarray(valores, dtype='float64')
+    relleno = np.full((n - 1,) + valores.shape[1:], np.nan)
+    return sliding_window_view(np.concatenate([relleno, valores]), n, axis=0)
+
+
+def media_movil(valores, n):
+    return _ventanas(valores, n).mean(axis=-1)
+
+
+def desviacion_movil(valores, n):
+    return _ventanas(valores, n).std(axis=-1, ddof=1)
+
+
+def correlacion_movil(x, y, n):
+    """Correlación de Pearson entre ``x`` y cada columna de ``y`` en ventanas de ``n`` años."""
+    a = _ventanas(np.asarray(x, dtype='float64')[:, None], n)
+    b = _ventanas(y, n)
+    a = a - a.mean(axis=-1, keepdims=True)
+    b = b - b.mean(axis=-1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (a * b).sum(axis=-1) / np.sqrt((a * a).sum(axis=-1) * (b * b).sum(axis=-1))
+
+
+def cagr(valores, n):
+    """Tasa de crecimiento anual compuesta (%) de los últimos ``n`` años, en cada año."""
+    valores = np.asarray(valores, dtype='float64')
+    ### Valor de n años antes; NaN en los primeros n años (todos, si la ventana es más larga que la serie)
+    anterior = np.full_like(valores, np.nan)
+    if n < len(valores):
+        anterior[n:] = valores[:-n]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((valores / anterior) ** (1 / n) - 1) * 100
+
+
+def calcular(datos, n):
+    """Estadísticas móviles de ``n`` años sobre el panel ``datos``, sin caché."""
+    if n < 2:
+        raise ValueError('La ventana debe ser de al menos 2 años: {}'.format(n))
+    columnas = {}
+    for nombre, valores in zip(['mundial', 'chile'], cagr(datos[['mundial', 'chile']], n).T):
+        columnas['cagr_{}'.format(nombre)] = valores
+    moviles = datos[MOVILES].to_numpy()
+    for nombre, media, desviacion in zip(MOVILES, media_movil(moviles, n).T, desviacion_movil(moviles, n).T):
+        columnas['media_{}'.format(nombre)] = media
+        columnas['std_{}'.format(nombre)] = desviacion
+    correlaciones = correlacion_movil(datos['chile'], datos[RELACIONADAS], n)
+    for nombre, valores in zip(RELACIONADAS, correlaciones.T):
+        columnas['corr_{}'.format(nombre)] = valores
+    return pd.DataFrame(columnas, index=datos.index)
+
+
+def _hash_codigo():
+    global _codigo
+    if _codigo is None:
+        _codigo = hashlib.sha256(inspect.getsource(sys.modules[__name__]).encode()).hexdigest()
+    return _codigo
+
+
+def ventana(n, refrescar=False):
+    """Estadísticas móviles de ``n`` años, desde la caché si no cambiaron las fuentes ni este módulo."""
+    actual = '{}-{}-{}'.format(etapas.clave('panel_cobre'), _hash_codigo(), n)
+    if not refrescar and n in _memoria and _memoria[n][0] == actual:
+        return _memoria[n][1]
+
+    nombre = 'estadisticas_{}'.format(n)
+    metadatos = cache.DIRECTORIO / '{}.json'.format(nombre)
+    tabla = None
+    if not refrescar and metadatos.exists() and json.loads(metadatos.read_text()).get('clave') == actual:
+        tabla = cache.leer_tabla(nombre)
+    if tabla is None:
+        tabla = calcular(panel(), n)
+        cache.guardar_tabla(nombre, tabla)
+        metadatos.write_text(json.dumps({'clave': actual}))
+    _memoria[n] = (actual, tabla)
+    return tabla
+
+
+def ventanas(ns, refrescar=False):
+    """Estadísticas de varias ventanas, en una tabla con la ventana como primer nivel de columnas."""
+    return pd.concat({n: ventana(n, refrescar) for n in ns}, axis=1, names=['ventana', 'estadistica'])
+
+
+def resumen(desde=None, hasta=None):
+    """CAGR de la producción mundial y chilena y cuota media de Chile entre ``desde`` y ``hasta``."""
+    datos = panel().loc[desde:hasta, ['mundial', 'chile', 'cuota']].dropna()
+    años = datos.index[-1] - datos.index[0]
+    crecimiento = (datos.iloc[-1] / datos.iloc[0]) ** (1 / años) - 1
+    return pd.Series({
+        'desde': datos.index[0],
+        'hasta': datos.index[-1],
+        'cagr_mundial': crecimiento['mundial'] * 100,
+        'cagr_chile': crecimiento['chile'] * 100,
+        'cuota_media': datos['cuota'].mean(),
+    })
@@ -0,0 +1,281 @@
+"""Etapas del procesamiento como un grafo de dependencias con memoización.
+
+Cada etapa es una función registrada con ``@etapa``, que declara las etapas
+de las que depende (sus argumentos, en orden) y los archivos fuente que lee
+directamente. Su clave es el hash de su código, del código de los módulos
+de ``mineria`` que usa (directa o indirectamente), de los archivos fuente y
+de las claves de sus dependencias; el resultado se guarda en
+``.cache/etapas/`` y sólo se recalcula si la clave cambia. Así, pedir
+``obtener('data')`` no toca las ramas de compañías o minerales, y si sólo
+cambió ``cobre/precios.csv`` se recalcula únicamente esa rama.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import types
+
+import pandas as pd
+
+from . import balanza as bc
+from . import banco_mundial, cache, companias, concentracion, cuotas, fuentes, instrumentacion, libros, precios, regiones, traducciones
+
+# Cambiar para invalidar todas las etapas (el código de los módulos ya entra en la clave)
+VERSION = '1-{}'.format(traducciones.VERSION)
+
+# Nombre de la etapa: (función, dependencias, archivos fuente)
+ETAPAS = {}
+
+# Resultados ya calculados en este proceso: nombre -> (clave, valor)
+_memoria = {}
+
+# Hash de archivos fuente por (ruta, mtime, tamaño)
+_hashes = {}
+
+# Código de cada etapa y de los módulos que usa, por nombre de la etapa
+_codigos = {}
+
+
+def etapa(*dependencias, fuentes=()):
+    """Registra la función decorada como etapa, con sus ``dependencias`` y ``fuentes``."""
+    def registrar(funcion):
+        ETAPAS[funcion.__name__] = (funcion, dependencias, tuple(fuentes))
+        return funcion
+    return registrar
+
+
+def _hash_fuente(ruta):
+    ruta = cache.RAIZ / ruta
+    estado = os.stat(ruta)
+    llave = (str(ruta), estado.st_mtime_ns, estado.st_size)
+    if llave not in _hashes:
+        _hashes[llave] = cache.sha256(ruta)
+    return _hashes[llave]
+
+
+def _nombres(codigo):
+    ### Nombres globales que usa `codigo`, incluidas sus funciones anidadas
+    nombres = set(codigo.co_names)
+    for constante in codigo.co_consts:
+        if isinstance(constante, types.CodeType):
+            nombres |= _nombres(constante)
+    return nombres
+
+
+def _modulos(objeto, vistos):
+    ### Módulos del paquete que usa `objeto` (función o módulo), directa o indirectamente
+    if isinstance(objeto, types.ModuleType):
+        referencias = vars(objeto).values()
+    else:
+        referencias = [objeto.__globals__[n] for n in _nombres(objeto.__code__) if n in objeto.__globals__]
+    for referencia in referencias:
+        if isinstance(referencia, types.ModuleType):
+            if referencia.__name__.startswith(__package__ + '.') and referencia not in vistos:
+                vistos.add(referencia)
+                _modulos(referencia, vistos)
+        elif isinstance(referencia, types.FunctionType) and referencia.__module__ == __name__ \
+                and referencia not in vistos:
+            ### Funciones auxiliares de este módulo (p. ej. _por_categoria)
+            vistos.add(referencia)
+            _modulos(referencia, vistos)
+    return vistos
+
+
+def _codigo(nombre):
+    ### Código de la etapa, de sus auxiliares y de los módulos del paquete que usa
+    if nombre not in _codigos:
+        funcion = ETAPAS[nombre][0]
+        usados = sorted(_modulos(funcion, set()), key=lambda o: (o.__module__ if callable(o) else '', o.__name__))
+        _codigos[nombre] = '\n'.join([inspect.getsource(funcion)] + [inspect.getsource(o) for o in usados])
+    return _codigos[nombre]
+
+
+def clave(nombre, _claves=None):
+    """Hash que identifica el resultado de la etapa ``nombre`` con las fuentes actuales."""
+    _claves = {} if _claves is None else _claves
+    if nombre not in _claves:
+        funcion, dependencias, rutas = ETAPAS[nombre]
+        h = hashlib.sha256('{}:{}'.format(VERSION, _codigo(nombre)).encode())
+        for ruta in rutas:
+            h.update(_hash_fuente(ruta).encode())
+        for dependencia in dependencias:
+            h.update(clave(dependencia, _claves).encode())
+        _claves[nombre] = h.hexdigest()
+    return _claves[nombre]
+
+
+def _rutas(nombre):
+    directorio = cache.DIRECTORIO / 'etapas'
+    return directorio / '{}.pkl'.format(nombre), directorio / '{}.json'.format(nombre)
+
+
+def obtener(nombre, refrescar=False, _claves=None):
+    """Resultado de la etapa ``nombre``, recalculando sólo lo que cambió.
+
+    El resultado puede ser compartido entre llamadas: no debe modificarse
+    en el lugar.
+    """
+    _claves = {} if _claves is None else _claves
+    actual = clave(nombre, _claves)
+    if not refrescar and nombre in _memoria and _memoria[nombre][0] == actual:
+        return _memoria[nombre][1]
+
+    datos, metadatos = _rutas(nombre)
+    vigente = (not refrescar and datos.exists() and metadatos.exists()
+               and json.loads(metadatos.read_text()).get('clave') == actual)
+    funcion, dependencias, _ = ETAPAS[nombre]
+    ### Las dependencias se obtienen antes de medir la etapa, para no sumar su tiempo
+    entradas = [] if vigente else [obtener(dependencia, _claves=_claves) for dependencia in dependencias]
+    with instrumentacion.medir(nombre, 'etapa', entrada=entradas or None,
+                               origen='cache' if vigente else 'calculo') as evento:
+        if vigente:
+            valor = pd.read_pickle(datos)
+        else:
+            valor = funcion(*entradas)
+            datos.parent.mkdir(parents=True, exist_ok=True)
+            pd.to_pickle(valor, datos)
+            metadatos.write_text(json.dumps({'clave': actual}))
+        evento['salida'] = valor
+    _memoria[nombre] = (actual, valor)
+    return valor
+
+
+def dependencias(nombre):
+    """Todas las etapas de las que depende ``nombre`` (directa o indirectamente)."""
+    resultado = []
+    for dependencia in ETAPAS[nombre][1]:
+        for anterior in dependencias(dependencia) + [dependencia]:
+            if anterior not in resultado:
+                resultado.append(anterior)
+    return resultado
+
+
+def _rutas_fuente(*nombres):
+    return [fuentes.FUENTES[nombre][0] for nombre in nombres]
+
+
+# Manipulando datos (para inciso 9)
+
+@etapa(fuentes=_rutas_fuente('compania'))
+def compania():
+    ### Producción de cobre por compañía, un año por fila
+    return fuentes.cargar('compania').transpose()
+
+
+@etapa('compania')
+def compania_acumulada(compania):
+    return compania.cumsum()
+
+
+@etapa('compania')
+def empresas(compania):
+    ### Compañías clasificadas por grupo, con totales por año, acumulados y por grupo
+    return companias.construir(compania)
+
+
+def _por_categoria(df, registro):
+    ### Producción total por año y mineral, con la categoría traducida
+    df = df.groupby(['Year', 'Metallic and non-metallic minerals'], as_index=False)['Value'].sum()
+    df.columns = ['Año', 'Categoría', 'Valor total']
+    df['Categoría'] = traducciones.traducir(df['Categoría'], registro)
+    return df.set_index('Año')
+
+
+@etapa(fuentes=_rutas_fuente('minerales'))
+def minerales():
+    return _por_categoria(fuentes.cargar('minerales'), traducciones.METALICOS)
+
+
+@etapa(fuentes=_rutas_fuente('minerales_no'))
+def minerales_no():
+    return _por_categoria(fuentes.cargar('minerales_no'), traducciones.NO_METALICOS)
+
+
+@etapa(fuentes=_rutas_fuente('minerales'))
+def minerales_escala():
+    ### Producción de minerales metálicos por año, escala de la minería y mineral
+    df = fuentes.cargar('minerales')
+    df = pd.DataFrame({
+        'Año': df['Year'].to_numpy(),
+        'Escala': traducciones.traducir(df['Mining category'], traducciones.ESCALA).array,
+        'Categoría': traducciones.traducir(df['Metallic and non-metallic minerals'],
+                                           traducciones.METALICOS).array,
+        'Valor total': df['Value'].to_numpy(),
+    })
+    return df.set_index('Año')
+
+
+@etapa(fuentes=_rutas_fuente('region'))
+def region():
+    ### Índice regional de producción de cobre (ver mineria/regiones.py)
+    return regiones.construir(fuentes.cargar('region'))
+
+
+@etapa(fuentes=[libros.LIBROS['compartepais'][0]])
+def cuota_paises():
+    return cuotas.tabla()
+
+
+@etapa('cuota_paises')
+def cuota_totales(cuota_paises):
+    return cuotas.totales(cuota_paises)
+
+
+@etapa(fuentes=[libros.LIBROS['recursopais'][0]])
+def concentracion_mercados():
+    ### Cuotas, rankings, HHI y razones de concentración por mineral y año
+    return concentracion.construir()
+
+
+# Manipulando datos (para inciso 10)
+
+@etapa(fuentes=[libros.LIBROS['balanza'][0]])
+def balanza():
+    return bc.leer()
+
+
+@etapa(fuentes=_rutas_fuente('export', 'pib'))
+def indicadores():
+    return banco_mundial.tabla()
+
+
+@etapa('indicadores')
+def export(indicadores):
+    return banco_mundial.serie(indicadores, 'CHL', 'export')
+
+
+@etapa('indicadores')
+def pib(indicadores):
+    return banco_mundial.serie(indicadores, 'CHL', 'pib')
+
+
+@etapa(fuentes=[precios.RUTA])
+def pcobre():
+    ### Precio del cobre (agregados anuales, sin los años incompletos)
+    return precios.anual()
+
+
+@etapa('export', 'pib', 'pcobre')
+def data(export, pib, pcobre):
+    ### Exportaciones, aporte al PIB y precio del cobre, alineados por año
+    df = precios.alinear(export, pib, pcobre['media'], join='outer')
+    df.columns = ['Exportaciones (%)', 'Aporte PIB (%)', 'Precio del cobre (dólares)']
+    df.index = pd.to_datetime(df.index.astype(str))
+    return df
+
+
+@etapa(fuentes=_rutas_fuente('comparativa'))
+def comparativa():
+    ### Producción mundial y chilena de cobre de mina (miles de TM) desde 1950
+    return fuentes.cargar('comparativa')
+
+
+@etapa('comparativa', 'export', 'pib', 'pcobre')
+def panel_cobre(comparativa, export, pib, pcobre):
+    ### Producción, cuota de Chile (%), precio e indicadores, alineados por año
+    df = precios.alinear(comparativa[['mundial', 'chile']], pcobre['media'], pib, export, join='outer')
+    df.columns = ['mundial', 'chile', 'precio', 'pib', 'export']
+    df.insert(2, 'cuota', df['chile'] / df['mundial'] * 100)
+    df.index.name = 'Año'
+    return df
@@ -0,0 +1,91 @@
+"""Lectura de las fuentes de datos del repositorio.
+
+Cada fuente tiene un lector que conoce su formato (separador, filas de
+encabezado, codificación, ...) y devuelve un dataframe tipado. ``cargar``
+pasa por la caché columnar, por lo que cada archivo se parsea una sola vez
+mientras no cambie.
+"""
+
+import pandas as pd
+
+from . import cache, instrumentacion, numeros
+
+
+def _compania(ruta):
+    ### Producción de cobre por compañía (INE)
+    df = pd.read_csv(ruta, index_col=0, dtype=str)
+    ### 2018 viene con punto de miles y coma decimal, el resto con punto decimal
+    df = numeros.convertir_tabla(df, 'simple', df.columns[df.columns != '2018'])
+    return numeros.convertir_tabla(df, 'es', ['2018'])
+
+
+# Filas de produccion_comparativa.csv y nombre de su columna
+COMPARATIVA = {
+    'PRODUCCION MUNDIAL': 'mundial',
+    'PRODUCCION CHILE': 'chile',
+    'Chile en Producción Mundial': 'participacion',
+}
+
+
+def _comparativa(ruta):
+    ### Producción mundial y chilena de cobre de mina, un año por columna (Cochilco)
+    df = pd.read_csv(ruta, sep=';', index_col=0, encoding='latin-1', dtype=str).dropna(how='all')
+    df = numeros.convertir_tabla(df.loc[list(COMPARATIVA)].drop(columns='Unidad'), 'es')
+    df = df.transpose().rename(columns=COMPARATIVA)
+    df.index = df.index.astype(int).rename('Año')
+    df.columns.name = None
+    return df
+
+
+def _minerales(ruta):
+    ### Producción de minerales metálicos y no metálicos a nivel nacional (INE)
+    return pd.read_csv(ruta, index_col=0)
+
+
+def _region(ruta):
+    ### Producción de cobre por región (datos.gob.cl)
+    return pd.read_csv(ruta, index_col=0, dtype={'DTI_CL_CUT_2010': str})
+
+
+def _banco_mundial(ruta):
+    ### Indicadores de Databank (exportaciones y aporte al PIB)
+    df = pd.read_csv(ruta, skiprows=4, dtype=str)
+    df = df.loc[:, ~df.columns.str.startswith('Unnamed')]
+    return numeros.convertir_tabla(df, 'simple', df.columns[4:])
+
+
+def _precios(ruta, continuacion=False):
+    ### Precio del cobre (Macrotrends); con `continuacion` se leen líneas agregadas, sin encabezado
+    if continuacion:
+        df = pd.read_csv(ruta, header=None, names=['date', 'value'], parse_dates=['date'], dtype={'value': str})
+    else:
+        df = pd.read_csv(ruta, skiprows=15, parse_dates=['date'], dtype={' value': str})
+        df.columns = df.columns.str.strip()
+    df['value'] = numeros.convertir(df['value'], 'simple')
+    return df
+
+
+### Nombre de la fuente: (ruta, lector, versión del lector)
+FUENTES = {
+    'compania': ('cobre/compania.csv', _compania, 2),
+    'region': ('cobre/region.csv', _region, 1),
+    'comparativa': ('cobre/produccion_comparativa.csv', _comparativa, 1),
+    'precios': ('cobre/precios.csv', _precios, 2),
+    'minerales': ('mineral_general/mineral_produccion.csv', _minerales, 1),
+    'minerales_no': ('mineral_general/mineral_produccion_no.csv', _minerales, 1),
+    'export': ('paises/exportacionpais.csv', _banco_mundial, 2),
+    'pib': ('paises/pibpais.csv', _banco_mundial, 2),
+}
+
+
+def cargar(nombre, refrescar=False):
+    """Devuelve la fuente ``nombre`` ya parseada, reconstruyéndola sólo si cambió."""
+    ruta, lector, version = FUENTES[nombre]
+    with instrumentacion.medir(nombre, 'carga') as evento:
+        df = evento['salida'] = cache.cacheado(nombre, ruta, lector, version=version, refrescar=refrescar)
+    return df
+
+
+def cargar_todo(refrescar=False):
+    """Carga todas las fuentes, en un diccionario por nombre."""
+    return {nombre: cargar(nombre, refrescar) for nombre in FUENTES}
@@ -0,0 +1,225 @@
+"""Funciones para graficar y renderizado de informes sin interfaz.
+
+``dispersion``, ``bar`` y ``lin`` son las funciones del notebook; con
+``mostrar=False`` no llaman a ``plt.show()`` y devuelven la figura. Además
+se agregan ``torta``, ``distribucion`` y ``puntos`` para el resto de los
+gráficos del notebook.
+
+``renderizar`` recibe una lista declarativa de gráficos, los dibuja con el
+backend Agg en un pool de procesos y guarda cada uno en PNG/SVG. Un gráfico
+cuyos datos, parámetros y función de dibujo no cambiaron desde la última
+vez no se vuelve a dibujar.
+
+matplotlib y seaborn se importan (y se aplica el estilo de seaborn) recién
+al dibujar el primer gráfico, de modo que importar este módulo, declarar
+gráficos o calcular sus huellas no carga las librerías de gráficos.
+"""
+
+import hashlib
+import inspect
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from . import instrumentacion
+
+# matplotlib.pyplot, seaborn y matplotlib.ticker, una vez cargados
+_librerias = None
+
+
+def librerias():
+    """Importa matplotlib y seaborn la primera vez y devuelve ``(plt, sns, mtick)``."""
+    global _librerias
+    if _librerias is None:
+        import matplotlib.pyplot as plt
+        import matplotlib.ticker as mtick
+        import seaborn as sns
+        ### Para mejor visualización
+        sns.set(rc={'figure.figsize': (10, 8.27)})
+        _librerias = plt, sns, mtick
+    return _librerias
+
+
+def _terminar(fig, mostrar):
+    if mostrar:
+        librerias()[0].show()
+    return fig
+
+
+def dispersion(x, y, data, tamaño=(9, 6), res=100,
+               color=None, titulo=None, xlabel=None, ylabel=None, sym=None, mostrar=True
+               ):
+    plt, _, mtick = librerias()
+    fig, ax = plt.subplots(figsize=tamaño, dpi=res)
+    ax.yaxis.set_major_formatter(mtick.PercentFormatter(symbol=sym))
+    plt.scatter(x=x, y=y, color=color, data=data)
+    plt.title(titulo)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    return _terminar(fig, mostrar)
+
+
+def bar(data, tamaño=(9, 6), res=100, x=None, y=None,
+        color=None, titulo=None, xlabel=None, ylabel=None, rot=0, ci=None, offset=True, mostrar=True
+        ):
+    plt, sns, mtick = librerias()
+    if isinstance(data, pd.DataFrame) and x in data and isinstance(data[x].dtype, pd.CategoricalDtype):
+        ### Sólo las categorías presentes (p. ej. tras filtrar minerales)
+        data = data.assign(**{x: data[x].cat.remove_unused_categories()})
+    fig, ax = plt.subplots(figsize=tamaño, dpi=res)
+    sns.barplot(data=data, x=x, y=y, hue=color, ci=ci)
+    plt.title(titulo)
+    plt.xticks(rotation=rot)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    ax.get_yaxis().set_major_formatter(
+        mtick.FuncFormatter(lambda x, p: format(int(x), ',')))
+    return _terminar(fig, mostrar)
+
+
+def lin(data, tamaño=(9, 6), res=100,
+        color=None, titulo=None, xlabel=None, ylabel=None, rot=0, mostrar=True
+        ):
+    plt, sns, mtick = librerias()
+    fig, ax = plt.subplots(figsize=tamaño, dpi=res)
+    sns.lineplot(data=data)
+    ax.get_yaxis().set_major_formatter(
+        mtick.FuncFormatter(lambda x, p: format(int(x), ',')))
+    plt.xticks(rotation=rot)
+    plt.title(titulo)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    return _terminar(fig, mostrar)
+
+
+def torta(valores, etiquetas, titulo=None, separacion=0.15, inicio=10, distancia=1.2, radio=2,
+          pct_distancia=0.6, pad=40, mostrar=True):
+    plt, _, _ = librerias()
+    fig, ax = plt.subplots()
+    ax.pie(valores, labels=etiquetas, autopct='%1.1f%%', startangle=inicio,
+           explode=[separacion] * len(valores), labeldistance=distancia, radius=radio,
+           pctdistance=pct_distancia)
+    plt.title(titulo, pad=pad, loc='left')
+    ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
+    return _terminar(fig, mostrar)
+
+
+def distribucion(data, x, hue=None, titulo=None, xlabel=None, ylabel=None, mostrar=True):
+    plt, sns, _ = librerias()
+    ax = sns.displot(data=data, x=x, hue=hue, kde=True)
+    plt.title(titulo)
+    ax.set(xlabel=xlabel, ylabel=ylabel)
+    return _terminar(ax.fig, mostrar)
+
+
+def puntos(data, x, y, hue=None, titulo=None, xlabel=None, ylabel=None, mostrar=True):
+    plt, sns, _ = librerias()
+    ax = sns.scatterplot(data=data, x=x, y=y, hue=hue)
+    plt.title(titulo)
+    ax.set(xlabel=xlabel, ylabel=ylabel)
+    return _terminar(ax.figure, mostrar)
+
+
+### Tipo de gráfico de cada especificación
+TIPOS = {
+    'dispersion': dispersion,
+    'bar': bar,
+    'lin': lin,
+    'torta': torta,
+    'distribucion': distribucion,
+    'puntos': puntos,
+}
+
+
+# Código de la función de cada tipo de gráfico, por tipo
+_codigos = {}
+
+
+def _codigo(tipo):
+    ### Código de la función de `tipo` y de las funciones de este módulo que usa (librerias, _terminar)
+    if tipo not in _codigos:
+        funcion = TIPOS[tipo]
+        usadas = [globals()[n] for n in sorted(funcion.__code__.co_names)
+                  if inspect.isfunction(globals().get(n))]
+        _codigos[tipo] = ''.join(inspect.getsource(f) for f in [funcion] + usadas)
+    return _codigos[tipo]
+
+
+def huella(especificacion):
+    """Hash de los datos y parámetros de un gráfico y del código de su tipo."""
+    h = hashlib.sha256()
+    for clave in sorted(especificacion):
+        valor = especificacion[clave]
+        h.update(clave.encode())
+        if clave == 'tipo' and valor in TIPOS:
+            h.update(_codigo(valor).encode())
+        if isinstance(valor, (pd.DataFrame, pd.Series, pd.Index)):
+            h.update(pd.util.hash_pandas_object(valor).to_numpy().tobytes())
+            if isinstance(valor, pd.DataFrame):
+                h.update(repr(valor.columns.tolist()).encode())
+        else:
+            h.update(repr(valor).encode())
+    return h.hexdigest()
+
+
+def dibujar(especificacion, mostrar=True):
+    """Dibuja el gráfico descrito por ``especificacion`` y devuelve la figura."""
+    parametros = dict(especificacion)
+    nombre = parametros.pop('nombre')
+    tipo = parametros.pop('tipo')
+    with instrumentacion.medir(nombre, 'grafico', entrada=parametros.get('data'), grafico=tipo):
+        return TIPOS[tipo](mostrar=mostrar, **parametros)
+
+
+def _dibujar(especificacion, rutas):
+    """Dibuja ``especificacion`` y la guarda en cada una de ``rutas``."""
+    fig = dibujar(especificacion, mostrar=False)
+    for ruta in rutas:
+        fig.savefig(ruta, bbox_inches='tight')
+    librerias()[0].close(fig)
+
+
+### En el pool, cada proceso hijo emite sus propios eventos: con un sumidero de archivo se
+### agregan al mismo archivo, con el sumidero en memoria quedan en el proceso hijo
+def _trabajador(especificacion, rutas):
+    import matplotlib
+    matplotlib.use('Agg')
+    _dibujar(especificacion, rutas)
+
+
+def renderizar(especificaciones, directorio, formatos=('png',), procesos=None):
+    """Guarda en ``directorio`` cada gráfico de ``especificaciones``.
+
+    Cada especificación es un diccionario con ``nombre`` (nombre del
+    archivo), ``tipo`` (clave de ``TIPOS``) y los parámetros de la función
+    correspondiente. Devuelve la lista de nombres que se dibujaron; los que
+    no cambiaron desde el último renderizado se omiten.
+    """
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    pendientes = []
+    for especificacion in especificaciones:
+        nombre = especificacion['nombre']
+        rutas = [directorio / '{}.{}'.format(nombre, formato) for formato in formatos]
+        ruta_huella = directorio / '{}.hash'.format(nombre)
+        actual = huella(especificacion)
+        if (all(ruta.exists() for ruta in rutas) and ruta_huella.exists()
+                and ruta_huella.read_text() == actual):
+            continue
+        pendientes.append((especificacion, rutas, ruta_huella, actual))
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1 and len(pendientes) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(pendientes))) as pool:
+            tareas = [pool.submit(_trabajador, e, rutas) for e, rutas, _, _ in pendientes]
+            for tarea in tareas:
+                tarea.result()
+    else:
+        for especificacion, rutas, _, _ in pendientes:
+            _dibujar(especificacion, rutas)
+
+    for _, _, ruta_huella, actual in pendientes:
+        ruta_huella.write_text(actual)
+    return [especificacion['nombre'] for especificacion, _, _, _ in pendientes]
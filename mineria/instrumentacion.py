@@ -0,0 +1,141 @@
+"""Eventos de tiempo y memoria de cada paso del procesamiento.
+
+Las etapas (``etapas.obtener``), la carga de fuentes y libros y el dibujo
+de gráficos emiten un evento por paso: tiempo de reloj y de CPU, pico de
+memoria del proceso (RSS), filas de entrada y de salida y memoria de la
+tabla resultante. Los eventos van a un sumidero configurable:
+
+* ``MINERIA_INSTRUMENTACION=memoria``: se guardan en ``eventos``.
+* ``MINERIA_INSTRUMENTACION=<ruta>``: se agregan como líneas JSON a ``<ruta>``.
+* ``configurar(funcion)``: cualquier función que reciba el evento.
+
+Sin la variable de entorno (o con ``configurar(None)``) la instrumentación
+está apagada y ``medir`` no mide nada.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Eventos del sumidero en memoria
+eventos = []
+
+# Función que recibe cada evento, o None si la instrumentación está apagada
+_sumidero = None
+
+
+def _archivo(ruta):
+    def escribir(evento):
+        with open(ruta, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(evento, ensure_ascii=False) + '\n')
+    return escribir
+
+
+def configurar(sumidero=None):
+    """Define el sumidero: ``None`` (apagado), ``'memoria'``, una ruta de archivo o una función."""
+    global _sumidero
+    if sumidero is None or sumidero == '':
+        _sumidero = None
+    elif callable(sumidero):
+        _sumidero = sumidero
+    elif sumidero == 'memoria':
+        _sumidero = eventos.append
+    else:
+        _sumidero = _archivo(sumidero)
+
+
+def activo():
+    """Indica si hay un sumidero configurado."""
+    return _sumidero is not None
+
+
+def _rss_pico():
+    ### Pico de memoria residente del proceso, en bytes (ru_maxrss viene en KB en Linux)
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _suma(valores):
+    valores = [v for v in valores if v is not None]
+    return sum(valores) if valores else None
+
+
+def _filas(valor):
+    ### Filas de una tabla, o la suma de las filas de varias (lista o diccionario de tablas)
+    if isinstance(valor, dict):
+        return _suma(_filas(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return _suma(_filas(v) for v in valor)
+    return len(valor) if isinstance(valor, (pd.DataFrame, pd.Series, pd.Index)) else None
+
+
+def _memoria(valor):
+    if isinstance(valor, dict):
+        return _suma(_memoria(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return _suma(_memoria(v) for v in valor)
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    return None
+
+
+@contextmanager
+def medir(nombre, tipo='etapa', entrada=None, **datos):
+    """Mide el bloque y emite un evento ``nombre`` de tipo ``tipo``.
+
+    Entrega un diccionario en el que el bloque puede dejar ``salida`` (la
+    tabla producida) y otros datos del evento. ``entrada`` es la tabla (o
+    tablas) que recibe el paso.
+    """
+    evento = dict(datos)
+    if _sumidero is None:
+        yield evento
+        return
+    inicio, reloj, cpu = time.time(), time.perf_counter(), time.process_time()
+    try:
+        yield evento
+    except BaseException as error:
+        evento['error'] = repr(error)
+        raise
+    finally:
+        segundos, cpu = time.perf_counter() - reloj, time.process_time() - cpu
+        ### Se emite una copia: el bloque puede seguir usando su diccionario (y su ``salida``)
+        registro = dict(evento)
+        salida = registro.pop('salida', None)
+        registro.update({
+            'nombre': nombre,
+            'tipo': tipo,
+            'inicio': inicio,
+            'segundos': segundos,
+            'cpu': cpu,
+            'rss_pico': _rss_pico(),
+            'filas_entrada': _filas(entrada),
+            'filas_salida': _filas(salida),
+            'memoria': _memoria(salida),
+        })
+        _sumidero(registro)
+
+
+def resumen(registro=None):
+    """Tabla de los eventos de ``registro`` (los del sumidero en memoria, por defecto)."""
+    return pd.DataFrame(eventos if registro is None else registro)
+
+
+def leer(ruta):
+    """Eventos guardados en el archivo de líneas JSON ``ruta``."""
+    with open(ruta, encoding='utf-8') as f:
+        return resumen([json.loads(linea) for linea in f if linea.strip()])
+
+
+configurar(os.environ.get('MINERIA_INSTRUMENTACION'))
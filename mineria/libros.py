@@ -0,0 +1,144 @@
+"""Lectura directa de los libros Excel de ``paises/``.
+
+Los CSV de ``paises/`` son exportaciones a mano de estos libros y pueden
+quedar desfasados. ``convertir`` abre cada libro una sola vez por versión
+del archivo: lee todas sus hojas en una pasada, las tipa y guarda cada hoja
+como una tabla de la caché columnar. El archivo de metadatos del libro
+guarda la huella del archivo y un hash por hoja; si el libro cambia, sólo
+se reescriben las hojas cuyo contenido cambió. Mientras el libro no
+cambie, ``hoja`` y ``cargar`` leen directamente de la caché, sin abrir el
+lector de Excel.
+"""
+
+import hashlib
+import re
+
+import pandas as pd
+
+from . import cache, instrumentacion
+
+# Columnas de cada hoja del libro de cuotas del BGR
+CUOTAS = ['Rank 2019', 'Rank 2018', 'Country', 'unit', 'Production 2019', 'Share in %', 'Share cum.%',
+          'Share HHI']
+
+
+def _encabezado(bruto, fila):
+    ### Nombres de columna desde la fila `fila`; los años (2015.0) quedan como texto ('2015')
+    nombres = bruto.iloc[fila].tolist()
+    return [str(int(n)) if isinstance(n, float) else str(n).strip() for n in nombres]
+
+
+def _numeros(df, columnas):
+    df[columnas] = df[columnas].apply(pd.to_numeric).astype('float64')
+    return df
+
+
+def _fila(bruto, primera):
+    ### Posición de la primera fila cuya primera celda es `primera`
+    celdas = bruto.iloc[:, 0].astype('string').str.strip()
+    filas = celdas.eq(primera).fillna(False).to_numpy().nonzero()[0]
+    if not len(filas):
+        raise ValueError('No se encontró la fila de encabezado {!r}'.format(primera))
+    return filas[0]
+
+
+def _hoja_cuotas(bruto):
+    ### Cuota por país de la producción mundial de un mineral (World Mining Data, 6.5)
+    df = bruto.iloc[2:, :len(CUOTAS)].set_axis(CUOTAS, axis=1)
+    df = df[df['Country'].notna()].reset_index(drop=True)
+    df[['Rank 2018', 'Country', 'unit']] = df[['Rank 2018', 'Country', 'unit']].astype('string')
+    return _numeros(df, ['Rank 2019', 'Production 2019', 'Share in %', 'Share cum.%', 'Share HHI'])
+
+
+def _hoja_recursos(bruto):
+    ### Producción por país de un mineral, un año por columna (World Mining Data, 6.4)
+    df = bruto.iloc[2:].set_axis(_encabezado(bruto, 1), axis=1)
+    df = df[df['Country'].notna()].reset_index(drop=True)
+    años = [c for c in df.columns if c.isdigit()]
+    df[['Country', 'unit', 'data source']] = df[['Country', 'unit', 'data source']].astype('string')
+    return _numeros(df, años)
+
+
+### Nombre del libro: (ruta, lector de cada hoja, versión del lector); los módulos que leen un
+### libro con su propio esquema registran su lector con ``@libro`` (p. ej. ``balanza``)
+LIBROS = {
+    'compartepais': ('paises/compartepais.xlsx', _hoja_cuotas, 1),
+    'recursopais': ('paises/recursopais.xlsx', _hoja_recursos, 1),
+}
+
+
+def libro(nombre, ruta, version=1):
+    """Registra la función decorada como lector de cada hoja del libro ``nombre`` (en ``ruta``)."""
+    def registrar(lector):
+        LIBROS[nombre] = (ruta, lector, version)
+        return lector
+    return registrar
+
+
+def _nombre(libro, hoja):
+    ### Nombre de la tabla de la caché para una hoja ('Iron (Fe)' -> libro_compartepais_iron_fe)
+    return 'libro_{}_{}'.format(libro, re.sub(r'[^0-9a-z]+', '_', hoja.lower()).strip('_'))
+
+
+def _hash(df):
+    h = pd.util.hash_pandas_object(df).to_numpy().tobytes()
+    return hashlib.sha256(h + repr(df.columns.tolist()).encode()).hexdigest()
+
+
+def _convertir(libro, refrescar=False):
+    ### Metadatos vigentes del libro y hojas reescritas en esta llamada
+    ruta, lector, version = LIBROS[libro]
+    ruta = cache.RAIZ / ruta
+    nombre = 'libro_{}'.format(libro)
+    meta = None if refrescar else cache.vigentes(nombre, ruta, version)
+    ### También se reconvierte si falta alguna hoja (p. ej. si la caché cambió de formato)
+    if meta is not None and all(cache.existe(_nombre(libro, hoja)) for hoja in meta['hojas']):
+        return meta, []
+
+    anteriores = (cache.metadatos(nombre) or {}).get('hojas', {})
+    hashes, cambiadas, tablas = {}, [], {}
+    with instrumentacion.medir(nombre, 'carga') as evento:
+        for hoja, bruto in pd.read_excel(ruta, sheet_name=None, header=None, dtype=object).items():
+            tablas[hoja] = df = lector(bruto)
+            hashes[hoja] = _hash(df)
+            tabla = _nombre(libro, hoja)
+            if anteriores.get(hoja) != hashes[hoja] or cache.leer_tabla(tabla) is None:
+                cache.guardar_tabla(tabla, df)
+                cambiadas.append(hoja)
+        ### Hojas que ya no están en el libro
+        for hoja in set(anteriores) - set(hashes):
+            cache.eliminar(_nombre(libro, hoja))
+        cache.guardar_metadatos(nombre, ruta, version, hojas=hashes)
+        evento.update(salida=tablas, hojas_cambiadas=len(cambiadas))
+    return cache.metadatos(nombre), cambiadas
+
+
+def convertir(libro, refrescar=False):
+    """Convierte ``libro`` a la caché si cambió y devuelve las hojas reescritas.
+
+    Si el libro no cambió desde la última conversión no se abre y se
+    devuelve una lista vacía.
+    """
+    return _convertir(libro, refrescar)[1]
+
+
+def hojas(libro):
+    """Nombres de las hojas de ``libro``, en el orden del archivo."""
+    return list(_convertir(libro)[0]['hojas'])
+
+
+def hoja(libro, nombre):
+    """Tabla tipada de la hoja ``nombre`` de ``libro``."""
+    if nombre not in hojas(libro):
+        raise KeyError('El libro {!r} no tiene la hoja {!r}'.format(libro, nombre))
+    return cache.leer_tabla(_nombre(libro, nombre))
+
+
+def cargar(libro, nombres=None):
+    """Diccionario hoja -> tabla con las hojas ``nombres`` de ``libro`` (todas, por defecto)."""
+    disponibles = hojas(libro)
+    nombres = disponibles if nombres is None else nombres
+    faltantes = [nombre for nombre in nombres if nombre not in disponibles]
+    if faltantes:
+        raise KeyError('El libro {!r} no tiene las hojas {}'.format(libro, faltantes))
+    return {nombre: cache.leer_tabla(_nombre(libro, nombre)) for nombre in nombres}
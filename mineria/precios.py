@@ -0,0 +1,149 @@
+"""Serie del precio del cobre con agregados mensuales y anuales incrementales.
+
+La serie diaria de Macrotrends (``cobre/precios.csv``) se guarda en la caché
+junto con acumuladores por mes (conteo, suma, mínimo, máximo, último valor y
+sumas de retornos logarítmicos). Cuando el archivo sólo crece, se parsean
+únicamente las líneas nuevas y se combinan con los acumuladores existentes;
+si cambia cualquier parte ya leída, se reconstruye todo.
+
+Los agregados anuales se obtienen de los mensuales y se indexan por año
+(entero), de modo que se alinean con otras series por año y no por posición.
+"""
+
+import hashlib
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from . import cache, fuentes
+
+RUTA = 'cobre/precios.csv'
+VERSION = 1
+
+# Cómo se combinan los acumuladores de dos tramos del mismo periodo
+COMBINAR = {'n': 'sum', 'suma': 'sum', 'minimo': 'min', 'maximo': 'max', 'ultimo': 'last',
+            'n_ret': 'sum', 'suma_ret': 'sum', 'suma2_ret': 'sum'}
+
+
+def _acumular(diario, previo=np.nan):
+    """Acumuladores por mes de ``diario``; ``previo`` es el último precio anterior al tramo."""
+    precio = diario['value'].to_numpy()
+    ret = np.diff(np.log(np.concatenate([[previo], precio])))
+    mes = diario['date'].dt.to_period('M').dt.to_timestamp()
+    g = pd.DataFrame({'precio': precio, 'ret': ret, 'ret2': ret ** 2}).groupby(mes.to_numpy())
+    acumulado = pd.DataFrame({
+        'n': g['precio'].count(), 'suma': g['precio'].sum(),
+        'minimo': g['precio'].min(), 'maximo': g['precio'].max(), 'ultimo': g['precio'].last(),
+        'n_ret': g['ret'].count(), 'suma_ret': g['ret'].sum(), 'suma2_ret': g['ret2'].sum(),
+    })
+    acumulado.index.name = 'mes'
+    return acumulado
+
+
+def _estadisticas(acumulado):
+    """Media, mínimo, máximo, último valor y volatilidad (desv. estándar de retornos log)."""
+    n = acumulado['n_ret']
+    varianza = (acumulado['suma2_ret'] - acumulado['suma_ret'] ** 2 / n) / (n - 1)
+    return pd.DataFrame({
+        'media': acumulado['suma'] / acumulado['n'],
+        'minimo': acumulado['minimo'],
+        'maximo': acumulado['maximo'],
+        'ultimo': acumulado['ultimo'],
+        'volatilidad': np.sqrt(varianza.clip(lower=0)),
+    })
+
+
+def _limpiar(df):
+    return df.dropna(subset=['value']).sort_values('date').reset_index(drop=True)
+
+
+def _reconstruir(contenido, fin):
+    diario = _limpiar(fuentes._precios(io.BytesIO(contenido[:fin])))
+    return diario, _acumular(diario)
+
+
+def _extender(diario, mensual, nuevas):
+    nuevas = _limpiar(fuentes._precios(io.BytesIO(nuevas), continuacion=True))
+    if len(diario):
+        nuevas = nuevas[nuevas['date'] > diario['date'].iloc[-1]]
+    if nuevas.empty:
+        return diario, mensual
+    previo = diario['value'].iloc[-1] if len(diario) else np.nan
+    tramo = _acumular(nuevas, previo)
+    mensual = pd.concat([mensual, tramo]).groupby(level='mes').agg(COMBINAR)
+    return pd.concat([diario, nuevas], ignore_index=True), mensual
+
+
+def actualizar(refrescar=False):
+    """Incorpora las filas nuevas de ``cobre/precios.csv`` y persiste las series.
+
+    Devuelve un diccionario con la serie ``diario`` y los agregados
+    ``mensual`` (``PeriodIndex``) y ``anual`` (índice por año).
+    """
+    contenido = (cache.RAIZ / RUTA).read_bytes()
+    # Sólo se consideran líneas completas
+    fin = contenido.rfind(b'\n') + 1
+    ruta_estado = cache.DIRECTORIO / 'precios_estado.json'
+    estado = json.loads(ruta_estado.read_text()) if ruta_estado.exists() else {}
+    diario = cache.leer_tabla('precios_diario')
+    mensual = cache.leer_tabla('precios_mensual')
+
+    inicio = estado.get('fin', 0)
+    vigente = (not refrescar and estado.get('version') == VERSION and diario is not None
+               and mensual is not None and inicio <= fin
+               and hashlib.sha256(contenido[:inicio]).hexdigest() == estado.get('sha256'))
+    if not vigente:
+        diario, mensual = _reconstruir(contenido, fin)
+    elif inicio < fin:
+        diario, mensual = _extender(diario, mensual, contenido[inicio:fin])
+
+    if not vigente or inicio < fin:
+        anual = mensual.groupby(mensual.index.year.rename('año')).agg(COMBINAR)
+        cache.guardar_tabla('precios_diario', diario)
+        cache.guardar_tabla('precios_mensual', mensual)
+        cache.guardar_tabla('precios_anual', anual)
+        ruta_estado.write_text(json.dumps({'version': VERSION, 'fin': fin,
+                                           'sha256': hashlib.sha256(contenido[:fin]).hexdigest()}))
+    else:
+        anual = cache.leer_tabla('precios_anual')
+
+    mensual = _estadisticas(mensual)
+    mensual.index = mensual.index.to_period('M')
+    return {'diario': diario.set_index('date')['value'], 'mensual': mensual, 'anual': _estadisticas(anual)}
+
+
+def diario():
+    """Precio diario del cobre (dólares por libra)."""
+    return actualizar()['diario']
+
+
+def mensual():
+    """Agregados mensuales del precio del cobre."""
+    return actualizar()['mensual']
+
+
+def anual(completos=True):
+    """Agregados anuales del precio del cobre.
+
+    Con ``completos`` se descartan el primer y el último año de la serie,
+    que sólo tienen datos parciales.
+    """
+    df = actualizar()['anual']
+    return df.iloc[1:-1] if completos else df
+
+
+def alinear(*series, join='inner'):
+    """Une series anuales por año, aceptando índices de años como texto, enteros o fechas."""
+    alineadas = []
+    for serie in series:
+        indice = serie.index
+        if isinstance(indice, pd.DatetimeIndex):
+            años = indice.year
+        elif pd.api.types.is_integer_dtype(indice):
+            años = indice
+        else:
+            años = pd.Index(indice).astype(str).str[:4].astype(int)
+        alineadas.append(serie.set_axis(pd.Index(años, name='año')))
+    return pd.concat(alineadas, axis=1, join=join).sort_index()
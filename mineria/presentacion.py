@@ -0,0 +1,24 @@
+"""Presentación de resultados en el notebook o en la consola.
+
+IPython sólo se importa si el código corre dentro de un kernel; fuera de un
+notebook (CLI, workers) los títulos y tablas se imprimen como texto.
+"""
+
+import sys
+
+
+def _en_notebook():
+    if 'IPython' not in sys.modules:
+        return False
+    from IPython import get_ipython
+    return get_ipython() is not None
+
+
+def mostrar(*objetos):
+    """Muestra ``objetos`` en orden; los textos se interpretan como Markdown."""
+    if _en_notebook():
+        from IPython.display import Markdown, display
+        display(*[Markdown(o) if isinstance(o, str) else o for o in objetos])
+    else:
+        for objeto in objetos:
+            print(objeto)
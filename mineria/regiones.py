@@ -0,0 +1,106 @@
+"""Producción de cobre por región, provincia y comuna (INE, ``cobre/region.csv``).
+
+Las filas se indexan por (año, código CUT). El código CUT 2010 de cinco
+dígitos codifica la jerarquía: ``RRPCC`` (región, provincia, comuna), con
+``RR000`` para una región y ``RRP00`` para una provincia. ``construir``
+precalcula una sola vez los totales por región y año (desde el nivel más
+agregado disponible), la participación de cada región en el total nacional
+y la variación anual; las consultas son búsquedas sobre esas tablas o
+cortes del índice ordenado, sin recorrer ni comparar nombres en la tabla
+original.
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import fuentes
+
+NIVELES = ['region', 'provincia', 'comuna']
+
+
+def _nombre(texto):
+    return texto.str.replace(r'^Region (of )?', '', regex=True).str.strip()
+
+
+def construir(bruto=None):
+    """Índice regional a partir de la tabla ``bruto`` de ``fuentes`` (o de la caché).
+
+    Devuelve un diccionario con:
+
+    * ``filas``: valores por (año, cut), con nivel, región, provincia y nombre.
+    * ``regiones``: total por año (filas) y región (columnas, código de dos dígitos).
+    * ``nacional``: total nacional por año.
+    * ``cuotas``: participación de cada región en el total nacional (%).
+    * ``variacion`` y ``variacion_pct``: cambio respecto del año anterior.
+    * ``nombres``: nombre de cada código CUT, y ``codigos``: código de cada nombre.
+    """
+    bruto = fuentes.cargar('region') if bruto is None else bruto
+    cut = bruto['DTI_CL_CUT_2010'].astype(str).str.zfill(5)
+    nivel = np.select([cut.str[2:] == '000', cut.str[3:] == '00'], NIVELES[:2], NIVELES[2])
+    filas = pd.DataFrame({
+        'año': bruto['Year'].to_numpy(),
+        'cut': cut.to_numpy(),
+        'nivel': pd.Categorical(nivel, categories=NIVELES),
+        'region': cut.str[:2].to_numpy(),
+        'provincia': cut.str[:3].to_numpy(),
+        'nombre': _nombre(bruto['Region Province Commune']).to_numpy(),
+        'valor': bruto['Value'].astype(float).to_numpy(),
+    }).set_index(['año', 'cut']).sort_index()
+
+    ### Total por región: fila de la región o, si falta, suma de provincias o de comunas
+    totales = None
+    for n in NIVELES:
+        parcial = filas[filas['nivel'] == n].groupby(['año', 'region'])['valor'].sum()
+        totales = parcial if totales is None else totales.combine_first(parcial)
+    regiones = totales.unstack('region').sort_index()
+    nacional = regiones.sum(axis=1)
+
+    nombres = filas.reset_index().drop_duplicates('cut', keep='last').set_index('cut')['nombre'].sort_index()
+    ### Un nombre repetido (región y provincia homónimas) apunta al nivel más agregado
+    codigos = pd.Series(nombres.index, index=nombres.str.lower())
+    return {
+        'filas': filas,
+        'regiones': regiones,
+        'nacional': nacional,
+        'cuotas': regiones.div(nacional, axis=0) * 100,
+        'variacion': regiones.diff(),
+        'variacion_pct': regiones.pct_change(fill_method=None) * 100,
+        'nombres': nombres,
+        'codigos': codigos[~codigos.index.duplicated()],
+    }
+
+
+def codigo(indice, region):
+    """Código de dos dígitos de ``region`` (código CUT o nombre, sin distinguir mayúsculas)."""
+    region = str(region)
+    if region.isdigit():
+        return region.zfill(5)[:2] if len(region) > 2 else region.zfill(2)
+    return indice['codigos'][region.lower()][:2]
+
+
+def serie(indice, region, medida='regiones'):
+    """Serie anual de ``medida`` (``regiones``, ``cuotas``, ``variacion`` o ``variacion_pct``) de ``region``."""
+    return indice[medida][codigo(indice, region)]
+
+
+def resumen(indice, año):
+    """Total, participación y variación anual de cada región en ``año``."""
+    regiones = indice['regiones'].columns
+    return pd.DataFrame({
+        'nombre': indice['nombres'].reindex(regiones + '000').to_numpy(),
+        'total': indice['regiones'].loc[año],
+        'cuota': indice['cuotas'].loc[año],
+        'variacion': indice['variacion'].loc[año],
+        'variacion_pct': indice['variacion_pct'].loc[año],
+    }, index=regiones).sort_values('total', ascending=False)
+
+
+def desglose(indice, cut, año):
+    """Filas del nivel inmediatamente inferior a ``cut`` (región -> provincias -> comunas) en ``año``."""
+    cut = str(cut).zfill(5)
+    if cut[2:] == '000':
+        desde, hasta, nivel = cut[:2] + '001', cut[:2] + '999', 'provincia'
+    else:
+        desde, hasta, nivel = cut[:3] + '01', cut[:3] + '99', 'comuna'
+    filas = indice['filas'].loc[(año, slice(desde, hasta)), :]
+    return filas[filas['nivel'] == nivel].droplevel('año')
@@ -0,0 +1,77 @@
+"""Registro de traducciones de las categorías del INE.
+
+Las tablas de producción minera del INE vienen con nombres en inglés. Las
+traducciones se mantienen aquí como diccionarios fijos, versionados con
+``VERSION``, y se aplican sobre columnas categóricas: se traduce una vez
+cada categoría (no cada fila) y los valores quedan guardados como códigos.
+"""
+
+import warnings
+
+import pandas as pd
+
+# Revisión del registro; cambiarla al agregar o corregir traducciones
+VERSION = '2021.1'
+
+METALICOS = {
+    'Copper': 'Cobre',
+    'Gold': 'Oro',
+    'Iron': 'Hierro',
+    'Lead': 'Plomo',
+    'Manganese': 'Manganeso',
+    'Molybdenum': 'Molibdeno',
+    'Silver': 'Plata',
+    'Zinc': 'Zinc',
+}
+
+NO_METALICOS = {
+    'Baryte': 'Barita',
+    'Boron compounds': 'Compuestos de boro',
+    'Calcium Carbonate': 'Carbonato de calcio',
+    'Clays': 'Arcillas',
+    'Copper sulfate': 'Sulfato de cobre',
+    'Diatomite': 'Diatomita',
+    'Dolomite': 'Dolomita',
+    'Feldspar': 'Feldespato',
+    'Iodine': 'Yodo',
+    'Lithium compounds': 'Compuestos de litio',
+    'Nitrates': 'Nitratos',
+    'Ornamental rocks': 'Rocas ornamentales',
+    'Peat': 'Turba',
+    'Perlite': 'Perlita',
+    'Phosphoric rocks': 'Rocas fosfóricas',
+    'Plaster': 'Yeso',
+    'Potassium compounds': 'Compuestos de potasio',
+    'Pumicite': 'Pumicita',
+    'Pyrophyllite': 'Pirofilita',
+    'Silicon resources': 'Recursos de silicio',
+    'Sodium chloride': 'Cloruro de sodio',
+    'Sodium sulfate': 'Sulfato de sodio',
+    'Sulfur compounds': 'Compuestos de azufre',
+    'Talc': 'Talco',
+    'Zeolites': 'Zeolitas',
+}
+
+ESCALA = {
+    'Large-scale mining': 'Gran minería',
+    'Medium-scale Mining': 'Mediana minería',
+    'Small-scale mining': 'Pequeña minería',
+}
+
+
+def traducir(valores, registro, desconocidos='conservar'):
+    """Traduce ``valores`` con ``registro`` y los devuelve como serie categórica.
+
+    Las categorías que no están en el registro se conservan con su nombre
+    original y se emite una advertencia (``desconocidos='conservar'``), o
+    bien se levanta ``KeyError`` (``desconocidos='error'``).
+    """
+    serie = pd.Series(valores).astype('category')
+    categorias = serie.cat.categories
+    faltantes = [c for c in categorias if c not in registro]
+    if faltantes:
+        mensaje = 'Categorías sin traducción (registro {}): {}'.format(VERSION, faltantes)
+        if desconocidos == 'error':
+            raise KeyError(mensaje)
+        warnings.warn(mensaje)
+    return serie.cat.rename_categories([registro.get(c, c) for c in categorias])